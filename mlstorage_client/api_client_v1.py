@@ -1,18 +1,67 @@
+from itertools import islice
+
+import orjson
 import requests
-from cachetools import LRUCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from mlstorage_client.schema import (validate_experiment_id,
                                      validate_experiment_doc,
                                      validate_relpath)
+from mlstorage_client.utils import JsonEncoder, json_loads
 
 __all__ = ['ApiClientV1']
 
+_json_encoder = JsonEncoder()
+
+
+def _put_bounded(cache, key, value, max_size, trim_size):
+    # Drop the oldest entries in bulk when the cache is full, which is
+    # cheaper than LRU bookkeeping on every access.
+    if key not in cache and len(cache) >= max_size:
+        for k in list(islice(cache, trim_size)):
+            del cache[k]
+    cache[key] = value
+
+
+try:
+    _RETRY_METHODS_ARG = 'allowed_methods'
+    _DEFAULT_RETRY_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+except AttributeError:  # urllib3 < 1.26
+    _RETRY_METHODS_ARG = 'method_whitelist'
+    _DEFAULT_RETRY_METHODS = Retry.DEFAULT_METHOD_WHITELIST
+
+
+def _make_adapter(retry_post):
+    methods = frozenset(_DEFAULT_RETRY_METHODS)
+    if retry_post:
+        methods |= {'POST'}
+    retry = Retry(total=3, backoff_factor=0.3,
+                  status_forcelist=(502, 503, 504), raise_on_status=False,
+                  **{_RETRY_METHODS_ARG: methods})
+    return HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                       max_retries=retry)
+
 
 class ApiClientV1(object):
     """
     Thin client binding for API v1.
     """
 
+    #: Maximum number of entries in the storage dir cache.
+    STORAGE_DIR_CACHE_SIZE = 512
+
+    #: Number of the oldest entries to drop when the cache is full.
+    STORAGE_DIR_CACHE_TRIM = 64
+
+    #: Maximum number of experiments to remember the last update for.
+    UPDATE_CACHE_SIZE = 32
+
+    #: POST endpoints retried on 502/503/504.  These requests can be
+    #: repeated with the same effect, while "/_create" cannot.
+    RETRY_POST_ENDPOINTS = ('/_query', '/_heartbeat/', '/_update/',
+                            '/_set_finished/')
+
     def __init__(self, base_uri):
         """
         Construct a new :class:`ClientV1`.
@@ -23,16 +72,45 @@ class ApiClientV1(object):
         """
         base_uri = base_uri.rstrip('/')
         self._base_uri = base_uri
-        self._storage_dir_cache = LRUCache(128)
+        self._v1_prefix = base_uri + '/v1'
+        self._storage_dir_cache = {}
+        self._heartbeat_endpoints = {}
+        self._last_updates = {}  # id -> (request body, response content)
+
+        # use a pooled session, such that the heartbeat and the collector
+        # jobs can reuse keep-alive connections to the server.  urllib3 only
+        # retries the error statuses of idempotent methods by default, so
+        # the POST endpoints listed in `RETRY_POST_ENDPOINTS` are mounted
+        # with an adapter which also retries POST.
+        self._session = requests.Session()
+        adapter = _make_adapter(retry_post=False)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        post_adapter = _make_adapter(retry_post=True)
+        for endpoint in self.RETRY_POST_ENDPOINTS:
+            self._session.mount(self._v1_prefix + endpoint, post_adapter)
+        self._session.headers['Connection'] = 'keep-alive'
 
     def _update_storage_dir_cache(self, doc):
-        self._storage_dir_cache[doc['id']] = doc['storage_dir']
+        # the storage dir of an experiment never changes
+        _put_bounded(self._storage_dir_cache, doc['id'], doc['storage_dir'],
+                     self.STORAGE_DIR_CACHE_SIZE, self.STORAGE_DIR_CACHE_TRIM)
 
     @property
     def base_uri(self):
         """Get the base URI of the MLStorage server."""
         return self._base_uri
 
+    def close(self):
+        """Close the underlying HTTP session."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def do_request(self, method, endpoint, **kwargs):
         """
         Do `method` request against given `endpoint`.
@@ -41,50 +119,90 @@ class ApiClientV1(object):
             method (str): The HTTP request method.
             endpoint (str): The endpoint of the API, should start with a
                 slash "/".  For example, "/_query".
-            \**kwargs: Arguments to be passed to :func:`requests.request`.
+            \**kwargs: Arguments to be passed to
+                :meth:`requests.Session.request`.  If `json` is specified,
+                it will be serialized by :meth:`JsonEncoder.dumps` as the
+                request body.
 
         Returns:
             The response object.
         """
-        uri = self.base_uri + '/v1' + endpoint
-        resp = requests.request(method, uri, **kwargs)
+        if 'json' in kwargs:
+            kwargs['data'] = _json_encoder.dumps(kwargs.pop('json'))
+            headers = dict(kwargs.get('headers') or ())
+            headers.setdefault('Content-Type', 'application/json')
+            kwargs['headers'] = headers
+        uri = self._v1_prefix + endpoint
+        resp = self._session.request(method, uri, **kwargs)
         if resp.status_code != 200:
             raise RuntimeError('HTTP error {}: {}'.
                                format(resp.status_code, resp.text))
         return resp
 
+    def do_json_request(self, method, endpoint, **kwargs):
+        """
+        Do `method` request against given `endpoint`, and parse the response
+        as JSON.
+
+        Args:
+            method (str): The HTTP request method.
+            endpoint (str): The endpoint of the API, should start with a
+                slash "/".  For example, "/_query".
+            \**kwargs: Arguments to be passed to :meth:`do_request`.
+
+        Returns:
+            The parsed JSON object.
+        """
+        return json_loads(self.do_request(method, endpoint, **kwargs).content)
+
     def query(self, filter=None, skip=0, limit=10):
-        ret = self.do_request(
+        ret = self.do_json_request(
             'POST', '/_query?skip={}&limit={}'.format(skip, limit),
-            json=filter or {}).json()
+            json=filter or {})
         for doc in ret:
             self._update_storage_dir_cache(doc)
         return ret
 
     def get(self, id):
         id = validate_experiment_id(id)
-        ret = self.do_request('GET', '/_get/{}'.format(id)).json()
+        ret = self.do_json_request('GET', '/_get/{}'.format(id))
         self._update_storage_dir_cache(ret)
         return ret
 
     def heartbeat(self, id):
         id = validate_experiment_id(id)
-        return self.do_request(
-            'POST', '/_heartbeat/{}'.format(id), data=b'').json()
+        endpoint = self._heartbeat_endpoints.get(id)
+        if endpoint is None:
+            endpoint = self._heartbeat_endpoints[id] = \
+                '/_heartbeat/{}'.format(id)
+        return self.do_json_request('POST', endpoint, data=b'')
 
     def create(self, name, doc_fields=None):
         doc_fields = dict(doc_fields or ())
         doc_fields['name'] = name
         doc_fields = validate_experiment_doc(doc_fields)
-        ret = self.do_request('POST', '/_create', json=doc_fields).json()
+        ret = self.do_json_request('POST', '/_create', json=doc_fields)
         self._update_storage_dir_cache(ret)
         return ret
 
     def update(self, id, doc_fields):
         id = validate_experiment_id(id)
         doc_fields = validate_experiment_doc(dict(doc_fields))
-        ret = self.do_request(
-            'POST', '/_update/{}'.format(id), json=doc_fields).json()
+        body = _json_encoder.dumps(doc_fields, option=orjson.OPT_SORT_KEYS)
+
+        # skip the request if it is identical to the last update
+        key = str(id)
+        last_update = self._last_updates.get(key)
+        if last_update is not None and last_update[0] == body:
+            return json_loads(last_update[1])
+
+        content = self.do_request(
+            'POST', '/_update/{}'.format(id), data=body,
+            headers={'Content-Type': 'application/json'}
+        ).content
+        ret = json_loads(content)
+        _put_bounded(self._last_updates, key, (body, content),
+                     self.UPDATE_CACHE_SIZE, 1)
         self._update_storage_dir_cache(ret)
         return ret
 
@@ -93,17 +211,19 @@ class ApiClientV1(object):
         doc_fields = dict(doc_fields or ())
         doc_fields['status'] = status
         doc_fields = validate_experiment_doc(doc_fields)
-        ret = self.do_request(
-            'POST', '/_set_finished/{}'.format(id), json=doc_fields).json()
+        self._last_updates.pop(str(id), None)
+        ret = self.do_json_request(
+            'POST', '/_set_finished/{}'.format(id), json=doc_fields)
         self._update_storage_dir_cache(ret)
         return ret
 
     def delete(self, id):
         id = validate_experiment_id(id)
-        ret = self.do_request(
-            'POST', '/_delete/{}'.format(id), data=b'').json()
+        ret = self.do_json_request(
+            'POST', '/_delete/{}'.format(id), data=b'')
         for i in ret:
             self._storage_dir_cache.pop(i, None)
+            self._last_updates.pop(i, None)
         return ret
 
     def get_storage_dir(self, id):
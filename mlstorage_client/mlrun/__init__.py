@@ -16,14 +16,14 @@ from mlstorage_client.utils import (collect_relative_files,
 
 from .runner import run_experiment
 
-__all__ = ['mlrun']
+__all__ = ['mlrun', 'run_from_dict']
 
 
 TensorBoardArgs = namedtuple('TensorBoardArgs', ['host', 'port'])
 ClientArgs = namedtuple(
     'EntryArgs',
     ['parent_id', 'name', 'description', 'tags', 'config', 'env', 'fingerprint',
-     'server', 'no_link', 'debug', 'tensorboard', 'args',
+     'server', 'no_link', 'force_verify_mount', 'debug', 'tensorboard', 'args',
      'cwd', 'script_files', 'data_files']
 )
 
@@ -59,6 +59,13 @@ ClientArgs = namedtuple(
                    '``os.environ["MLSTORAGE_SERVER_URI"]``.')
 @click.option('--no-link', is_flag=True, default=False, required=False,
               help='Do not link data files.')
+@click.option('--force-verify-mount', is_flag=True, default=False,
+              required=False,
+              help='Always verify the shared file system with the server, '
+                   'even if it has been verified recently.  The verification '
+                   'results are cached for '
+                   '``os.environ["MLSTORAGE_MOUNT_VERIFY_TTL"]`` seconds '
+                   '(3600 by default).')
 @click.option('--tensorboard', is_flag=True, default=False, required=False,
               help='Run TensorBoard in the program\'s working directory.')
 @click.option('--tensorboard-host', required=False, default=None,
@@ -71,7 +78,7 @@ ClientArgs = namedtuple(
                    'after finished.')
 @click.argument('args', nargs=-1)
 def mlrun(name, description, tags, config, config_file, env, env_file,
-          gpu, fingerprint, server, no_link,
+          gpu, fingerprint, server, no_link, force_verify_mount,
           tensorboard, tensorboard_host, tensorboard_port, debug,
           args):
     """
@@ -145,12 +152,56 @@ def mlrun(name, description, tags, config, config_file, env, env_file,
     from the experiment storage directory, while the copied `script` files will
     be left un-deleted.
     """
+    try:
+        client_args = _make_client_args(
+            name=name, description=description, tags=tags, config=config,
+            config_file=config_file, env=env, env_file=env_file, gpu=gpu,
+            fingerprint=fingerprint, server=server, no_link=no_link,
+            force_verify_mount=force_verify_mount, tensorboard=tensorboard,
+            tensorboard_host=tensorboard_host,
+            tensorboard_port=tensorboard_port, debug=debug, args=args
+        )
+    except ValueError as ex:
+        click.echo(str(ex), err=True)
+        sys.exit(-1)
+    run_experiment(client_args)
+
+
+def run_from_dict(kwargs):
+    """
+    Run an experiment with arguments given as a dict, without parsing
+    the command line.
+
+    This is useful for launching experiments from another Python program,
+    where the arguments are already Python objects.
+
+    Args:
+        kwargs (dict[str, any]): The named arguments, same as the options
+            of :func:`mlrun` (e.g., ``{'name': 'Experiment 1', 'args':
+            ['python', 'train.py']}``).  Options which can be specified
+            multiple times should be lists of strings.  If "server" is not
+            specified, will use ``os.environ["MLSTORAGE_SERVER_URI"]``.
+
+    Raises:
+        ValueError: If the arguments are invalid.
+    """
+    kwargs = dict(kwargs)
+    kwargs.setdefault(
+        'server', os.environ.get('MLSTORAGE_SERVER_URI', '') or None)
+    run_experiment(_make_client_args(**kwargs))
+
+
+def _make_client_args(name=None, description=None, tags=(), config=(),
+                      config_file=None, env=(), env_file=None, gpu=(),
+                      fingerprint=None, server=None, no_link=False,
+                      force_verify_mount=False, tensorboard=False,
+                      tensorboard_host=None, tensorboard_port=0, debug=False,
+                      args=()):
     # check the server
     parsed_server = urlparse(server)
     if parsed_server.scheme not in ('http', 'https'):
-        click.echo('`server` must be HTTP or HTTPS uri: got {}'.format(server),
-                   err=True)
-        sys.exit(-1)
+        raise ValueError('`server` must be HTTP or HTTPS uri: got {}'.
+                         format(server))
 
     # parse the parent id
     parent_id = os.environ.get('MLSTORAGE_EXPERIMENT_ID') or None
@@ -163,8 +214,7 @@ def mlrun(name, description, tags, config, config_file, env, env_file,
 
     # parse the arguments, find out script files and other files
     if not args:
-        click.echo('You must specify program arguments.', err=True)
-        sys.exit(-1)
+        raise ValueError('You must specify program arguments.')
     cwd = os.getcwd()
     arg_files = collect_relative_files(args, cwd)
     arg_scripts, arg_datafiles = [], []
@@ -177,16 +227,17 @@ def mlrun(name, description, tags, config, config_file, env, env_file,
     # choose a name if not specified
     if name is None:
         if not arg_scripts:
-            click.echo('Cannot infer the experiment name: no script file '
-                       'found.', err=True)
-            sys.exit(-1)
+            raise ValueError('Cannot infer the experiment name: no script '
+                             'file found.')
         name = arg_scripts[0]  # including the relative path
 
     # parse the tags
     merged_tags = []
+    seen_tags = set()
     for tag_text in tags:
         for tag in parse_tags(tag_text):
-            if tag not in merged_tags:
+            if tag not in seen_tags:
+                seen_tags.add(tag)
                 merged_tags.append(tag)
 
     # parse the config
@@ -205,17 +256,19 @@ def mlrun(name, description, tags, config, config_file, env, env_file,
         k, v = parse_env(env_text)
         env_dict[k] = v
     if gpu:
-        gpu_list = []
+        gpu_set = set()
         for gpu_text in gpu:
-            gpu_list.extend(filter(lambda s: s, gpu_text.split(',')))
+            gpu_set.update(s for s in gpu_text.split(',') if s)
 
-        def gpu_sort_key_func(g):
+        # numeric device IDs go first (in numeric order), then the others
+        numeric_gpus, textual_gpus = [], []
+        for g in gpu_set:
             try:
-                return '', int(g)
-            except (TypeError, ValueError):
-                return g, 0
-
-        gpu_list = sorted(set(gpu_list), key=gpu_sort_key_func)
+                numeric_gpus.append((int(g), g))
+            except ValueError:
+                textual_gpus.append(g)
+        gpu_list = ([g for _, g in sorted(numeric_gpus)] +
+                    sorted(textual_gpus))
         env_dict['CUDA_VISIBLE_DEVICES'] = ','.join(map(str, gpu_list))
 
     # parse the fingerprint
@@ -234,10 +287,11 @@ def mlrun(name, description, tags, config, config_file, env, env_file,
         parent_id=parent_id, name=name, description=description,
         tags=merged_tags, config=config_dict, env=env_dict,
         fingerprint=fingerprint, server=server, no_link=no_link,
-        debug=debug, tensorboard=tb_args, args=args,
+        force_verify_mount=force_verify_mount, debug=debug,
+        tensorboard=tb_args, args=args,
         cwd=cwd, script_files=set(arg_scripts), data_files=set(arg_datafiles),
     )
-    run_experiment(client_args)
+    return client_args
 
 
 if __name__ == '__main__':
@@ -1,5 +1,4 @@
-import codecs
-import json
+import hashlib
 import logging
 import os
 import shutil
@@ -9,16 +8,26 @@ import sys
 import time
 import traceback
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from threading import Thread, Condition
+from threading import Thread, Event, Lock, Timer
 from logging import getLogger
 
+import orjson
 import six
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover
+    FileSystemEventHandler = object
+    Observer = None
+
 import mlstorage_client
 from mlstorage_client.api_client_v1 import ApiClientV1
-from mlstorage_client.utils import (JsonEncoder, exec_proc, run_tensorboard,
-                                    clone_file_or_dir, compute_fs_size)
+from mlstorage_client.utils import (JsonEncoder, json_loads, exec_proc,
+                                    run_tensorboard, clone_file_or_dir,
+                                    compute_fs_size)
 
 __all__ = ['run_experiment']
 
@@ -98,39 +107,93 @@ def log_dict(title, var_dict):
 class CleanupHelper(object):
     """Class to help cleanup file entries."""
 
-    def __init__(self):
+    def __init__(self, executor=None):
+        """
+        Construct a new :class:`CleanupHelper`.
+
+        Args:
+            executor (concurrent.futures.Executor): If specified, remove the
+                file entries in parallel with this executor.
+                (default :obj:`None`)
+        """
         self._paths = set()
+        self._executor = executor
 
     def add(self, path):
         self._paths.add(path)
 
-    def cleanup(self):
-        paths = sorted(self._paths)
-        self._paths = set()
-        for path in paths:
+    @staticmethod
+    def _remove(path):
+        try:
+            st = os.stat(path, follow_symlinks=False)
+            if stat.S_ISDIR(st.st_mode):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _has_parent(path, paths):
+        parent = os.path.dirname(path)
+        while parent != path:
+            if parent in paths:
+                return True
+            path, parent = parent, os.path.dirname(parent)
+        return False
+
+    def cleanup(self, keep=()):
+        """
+        Remove the file entries.
+
+        Args:
+            keep (Iterable[str]): The entries to keep for now.  They will
+                be removed by the next call of this method.
+
+        Returns:
+            list[str]: The kept entries.
+        """
+        keep = self._paths.intersection(keep)
+        paths = self._paths - keep
+        self._paths = set(keep)
+
+        # entries under another entry will be removed along with the parent,
+        # thus they need not (and should not concurrently) be removed
+        paths = sorted(p for p in paths if not self._has_parent(p, paths))
+
+        if self._executor is not None:
+            futures = [self._executor.submit(self._remove, path)
+                       for path in paths]
+        else:
+            futures = [None] * len(paths)
+
+        for path, future in zip(paths, futures):
             try:
-                st = os.stat(path, follow_symlinks=False)
-                if stat.S_ISDIR(st.st_mode):
-                    shutil.rmtree(path)
+                if future is not None:
+                    future.result()
                 else:
-                    os.remove(path)
-            except FileNotFoundError:
-                pass
+                    self._remove(path)
             except Exception:
                 getLogger(__name__).info(
                     'Failed to cleanup: %s', path, exc_info=True)
                 self._paths.add(path)
 
+        return sorted(keep)
+
 
 class CronJob(object):
 
+    #: Seconds to wait after being woken up, before running the job, such
+    #: that a burst of wake-ups will only trigger one run.
+    wakeup_delay = 1.
+
     def __init__(self, name, interval, api, doc):
         self.name = name
         self.interval = interval
         self.api = api
         self.doc = doc
-        self.stopped = False
-        self.wait_cond = Condition()
+        self._stop_event = Event()
+        self._wakeup_event = Event()
 
     @property
     def id(self):
@@ -140,8 +203,17 @@ class CronJob(object):
     def storage_dir(self):
         return self.doc['storage_dir']
 
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def wakeup(self):
+        """Wake up the job thread to run the job before the next tick."""
+        self._wakeup_event.set()
+
     def _run_loop(self):
-        while not self.stopped:
+        while not self._stop_event.is_set():
+            self._wakeup_event.clear()
             try:
                 self.run_once()
                 getLogger(__name__).debug('Job thread %r executed.', self.name)
@@ -150,76 +222,352 @@ class CronJob(object):
                     'Failed to execute job %r: %s', self.name, str(ex),
                     exc_info=True
                 )
-            with self.wait_cond:
-                if not self.stopped:
-                    if self.wait_cond.wait(self.interval):
-                        break
+            if self._wakeup_event.wait(self.interval):
+                if self._stop_event.wait(self.wakeup_delay):
+                    break
 
     def run_once(self):
         raise NotImplementedError()
 
     @contextmanager
     def run_in_background(self):
-        self.stopped = False
+        self._stop_event.clear()
+        self._wakeup_event.clear()
         thread = Thread(target=self._run_loop, daemon=True)
         try:
             thread.start()
             yield self
         finally:
-            with self.wait_cond:
-                self.stopped = True
-                self.wait_cond.notify_all()
+            self._stop_event.set()
+            self._wakeup_event.set()
             thread.join()
             getLogger(__name__).debug('Job thread %r exited.', self.name)
 
 
-class HeartbeatJob(CronJob):
-
-    def __init__(self, name, api, doc):
-        super(HeartbeatJob, self).__init__(name, 120, api, doc)
-
-    def run_once(self):
-        self.api.heartbeat(self.id)
-
-
-class CollectJsonDictJob(CronJob):
+class JsonDictCollector(object):
+    """Class to collect a JSON dict from a file in the storage directory."""
 
-    def __init__(self, name, api, doc, filename, field, postprocess=None):
-        super(CollectJsonDictJob, self).__init__(name, 10, api, doc)
+    def __init__(self, filename, field, postprocess=None):
         self.filename = filename
         self.field = field
         self.postprocess = postprocess
         self.last_mtime = None
         self.last_size = None
-
-    def run_once(self, force=False):
-        path = os.path.join(self.storage_dir, self.filename)
+        self.last_hash = None
+        self.missing = False
+        self._pending = None
+
+        # the file descriptor and the buffer reused across the reads
+        self._fd = None
+        self._fd_key = None
+        self._buf = bytearray(65536)
+
+    def close(self):
+        """Close the cached file descriptor."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._fd_key = None
+
+    def _read(self, path, st):
+        if not hasattr(os, 'preadv'):  # pragma: no cover
+            with open(path, 'rb') as f:
+                return f.read()
+
+        # keep the file open across the reads, until it is replaced
+        if self._fd is None or self._fd_key != (st.st_dev, st.st_ino):
+            self.close()
+            self._fd = os.open(path, os.O_RDONLY)
+            fd_st = os.fstat(self._fd)
+            self._fd_key = (fd_st.st_dev, fd_st.st_ino)
+
+        # read into the reused buffer, growing it until the whole file fits
+        while len(self._buf) <= st.st_size:
+            self._buf = bytearray(len(self._buf) * 2)
+        while True:
+            n = os.preadv(self._fd, [self._buf], 0)
+            if n < len(self._buf):
+                return memoryview(self._buf)[:n]
+            self._buf = bytearray(len(self._buf) * 2)
+
+    def collect(self, storage_dir, force=False):
+        """
+        Collect the JSON dict, if the file has changed since the last commit.
+
+        Args:
+            storage_dir (str): The storage directory.
+            force (bool): Whether or not to collect the JSON dict even if
+                the file has not changed?  (default :obj:`False`)
+
+        Returns:
+            dict or None: The collected JSON dict, or None if not changed.
+        """
+        path = os.path.join(storage_dir, self.filename)
         try:
             st = os.stat(path, follow_symlinks=True)
-            if stat.S_ISREG(st.st_mode) and (force or
-                                             st.st_mtime != self.last_mtime or
-                                             st.st_size != self.last_size):
-                with codecs.open(path, 'rb', 'utf-8') as f:
-                    value = json.load(f)
-                    if not isinstance(value, dict):
-                        raise ValueError('JSON file content is not a dict')
-                    else:
-                        if self.postprocess:
-                            value = self.postprocess(value)
-                        self.api.update(self.id, {self.field: value})
-                        self.doc[self.field] = value
-                self.last_mtime = st.st_mtime
-                self.last_size = st.st_size
         except FileNotFoundError:
-            pass
+            self.missing = True
+            self.close()
+            return None
+        self.missing = False
+        if not stat.S_ISREG(st.st_mode) or not (
+                force or st.st_mtime != self.last_mtime or
+                st.st_size != self.last_size):
+            return None
+
+        raw = self._read(path, st)
+
+        # the program may re-write the file with identical content,
+        # in which case we do not need to update the server
+        h = hashlib.blake2b(raw, digest_size=16).digest()
+        if not force and h == self.last_hash:
+            self.last_mtime = st.st_mtime
+            self.last_size = st.st_size
+            return None
+
+        value = json_loads(raw)
+        if not isinstance(value, dict):
+            raise ValueError('JSON file content is not a dict')
+        if self.postprocess:
+            value = self.postprocess(value)
+        self._pending = (st.st_mtime, st.st_size, h)
+        return value
+
+    def commit(self):
+        """Mark the last collected JSON dict as stored to the server."""
+        if self._pending is not None:
+            self.last_mtime, self.last_size, self.last_hash = self._pending
+            self._pending = None
+
+
+class JsonFileWatcher(FileSystemEventHandler):
+    """Wake up a :class:`PollerJob` when any of its JSON files changes."""
+
+    #: The types of events which may change the content of a file.
+    WAKEUP_EVENT_TYPES = frozenset(['created', 'modified', 'closed', 'moved'])
+
+    def __init__(self, job):
+        super(JsonFileWatcher, self).__init__()
+        self.job = job
+        self.filenames = frozenset(c.filename for c in job.collectors)
+
+    def on_any_event(self, event):
+        if event.event_type not in self.WAKEUP_EVENT_TYPES:
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', None)):
+            if path and os.path.basename(path) in self.filenames:
+                self.job.wakeup()
+                break
+
+
+class PollerJob(CronJob):
+    """
+    Job to collect the JSON dicts and to send heartbeats.
+
+    The changed fields from all the collectors are merged into one single
+    update request at each tick, while the heartbeat is sent whenever
+    `heartbeat_interval` seconds have elapsed since the last heartbeat.
+    If the merged update fails, the fields are stored one by one, and the
+    fields failed to be stored are sent on their own in later ticks.
+    """
+
+    #: Check all the files at least once every this number of ticks.
+    FULL_SCAN_TICKS = 6
+
+    def __init__(self, name, api, doc, specs, interval=10,
+                 heartbeat_interval=120, watched_interval=60):
+        """
+        Construct a new :class:`PollerJob`.
+
+        Args:
+            name (str): Name of this job.
+            api (ApiClientV1): The API client.
+            doc (dict): The experiment document.
+            specs (list[tuple]): List of ``(filename, field, postprocess)``,
+                the arguments for constructing :class:`JsonDictCollector`.
+            interval (float): Seconds between two ticks. (default 10)
+            heartbeat_interval (float): Seconds between two heartbeats.
+                (default 120)
+            watched_interval (float): Seconds between two ticks, while the
+                files are watched by :meth:`watch_files`. (default 60)
+        """
+        super(PollerJob, self).__init__(name, interval, api, doc)
+        self.collectors = [JsonDictCollector(*spec) for spec in specs]
+        self.heartbeat_interval = heartbeat_interval
+        self.watched_interval = watched_interval
+        self._next_heartbeat = None
+        self._last_dir_mtime = None
+        self._ticks = 0
+        self._failed_fields = set()
+
+    def collect(self, force=False):
+        """
+        Collect the changed JSON dicts, and store them to the server.
+
+        Args:
+            force (bool): Whether or not to collect all the JSON dicts even if
+                the files have not changed?  (default :obj:`False`)
+        """
+        # Creating (or renaming) a file updates the mtime of the storage dir,
+        # so the missing files need not be checked again if the dir has not
+        # changed.  In case of coarse mtime resolution, all the files are
+        # still checked once every `FULL_SCAN_TICKS` ticks.
+        full_scan = force or self._ticks % self.FULL_SCAN_TICKS == 0
+        self._ticks += 1
+        try:
+            dir_mtime = os.stat(self.storage_dir).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        if dir_mtime is None or dir_mtime != self._last_dir_mtime:
+            full_scan = True
+        self._last_dir_mtime = dir_mtime
+
+        items = []
+        for collector in self.collectors:
+            if collector.missing and not full_scan:
+                continue
+            try:
+                value = collector.collect(self.storage_dir, force=force)
+            except Exception as ex:
+                getLogger(__name__).warning(
+                    'Failed to collect %r: %s', collector.filename, str(ex),
+                    exc_info=True
+                )
+            else:
+                if value is not None:
+                    items.append((collector, value))
+
+        # The fields are merged into one request, except for those failed
+        # to be stored last time, which are sent on their own, such that
+        # one rejected field does not keep the others from being stored.
+        batch, isolated = [], []
+        for item in items:
+            if item[0].field in self._failed_fields:
+                isolated.append(item)
+            else:
+                batch.append(item)
+        if len(batch) > 1:
+            try:
+                self._store(batch)
+                batch = []
+            except Exception as ex:
+                getLogger(__name__).warning(
+                    'Failed to store the merged fields %r, fall back to '
+                    'storing them one by one: %s',
+                    [c.field for c, _ in batch], str(ex)
+                )
+
+        error = None
+        for item in batch + isolated:
+            field = item[0].field
+            try:
+                self._store([item])
+            except Exception as ex:
+                self._failed_fields.add(field)
+                if error is not None:
+                    getLogger(__name__).warning(
+                        'Failed to store the field %r: %s', error[0],
+                        str(error[1]), exc_info=error[1]
+                    )
+                error = (field, ex)
+            else:
+                self._failed_fields.discard(field)
+        if error is not None:
+            raise error[1]
+
+    def _store(self, items):
+        fields = {collector.field: value for collector, value in items}
+        self.api.update(self.id, fields)
+        self.doc.update(fields)
+        for collector, _ in items:
+            collector.commit()
+
+    @contextmanager
+    def watch_files(self):
+        """
+        Watch the JSON files within a context, such that the changes are
+        collected immediately rather than at the next tick.
+
+        The polling interval is relaxed to `watched_interval` once the
+        files are being watched.  If :mod:`watchdog` is not installed, or
+        the storage directory cannot be watched, this context does nothing,
+        and the files are polled at the original interval.
+
+        Yields:
+            bool: Whether or not the files are being watched.
+        """
+        observer = None
+        if Observer is not None:
+            try:
+                observer = Observer()
+                observer.schedule(JsonFileWatcher(self), self.storage_dir,
+                                  recursive=False)
+                observer.start()
+            except Exception:
+                getLogger(__name__).info(
+                    'Failed to watch the JSON files, fall back to polling.',
+                    exc_info=True
+                )
+                observer = None
+
+        interval = self.interval
+        try:
+            if observer is not None:
+                self.interval = max(interval, self.watched_interval)
+                getLogger(__name__).debug(
+                    'Watching JSON files in: %s', self.storage_dir)
+            yield observer is not None
+        finally:
+            self.interval = interval
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def close(self):
+        """Close the files held by the collectors."""
+        for collector in self.collectors:
+            collector.close()
+
+    def run_once(self):
+        try:
+            self.collect()
+        finally:
+            # the heartbeat must not be suppressed by failed collections.
+            # schedule it by the monotonic clock rather than by counting
+            # ticks, such that slow ticks do not delay the heartbeat.
+            now = time.monotonic()
+            if self._next_heartbeat is None or now >= self._next_heartbeat:
+                self.api.heartbeat(self.id)
+                self._next_heartbeat = now + self.heartbeat_interval
 
 
 class ConsoleDuplicator(object):
 
-    def __init__(self, storage_dir, log_file):
+    #: Flush the buffered output once it reaches this number of bytes.
+    FLUSH_SIZE = 64 * 1024
+
+    #: Max number of seconds to hold the buffered output.
+    FLUSH_DELAY = .5
+
+    def __init__(self, storage_dir, log_file, read_size=16 * 1024):
+        """
+        Construct a new :class:`ConsoleDuplicator`.
+
+        Args:
+            storage_dir (str): The storage directory.
+            log_file (str): Name of the console log file.
+            read_size (int): Size of the buffer for reading the output,
+                i.e., the `buffer_size` of :func:`exec_proc`.
+                (default ``16 * 1024``)
+        """
         log_path = os.path.join(storage_dir, log_file)
         self.fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
         self.dup_fd = sys.stdout.fileno()
+        self.read_size = read_size
+        self._chunks = []
+        self._size = 0
+        self._lock = Lock()
+        self._timer = None
 
     def __enter__(self):
         # drain the sys.stdout and sys.stderr buffers
@@ -230,14 +578,46 @@ class ConsoleDuplicator(object):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.fd is not None:
-            os.close(self.fd)
-            self.fd = None
+        with self._lock:
+            if self.fd is not None:
+                try:
+                    self._flush()
+                finally:
+                    os.close(self.fd)
+                    self.fd = None
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._chunks and self.fd is not None:
+            buf = b''.join(self._chunks)
+            self._chunks = []
+            self._size = 0
+            os.write(self.fd, buf)
+            os.write(self.dup_fd, buf)
+            os.fsync(self.fd)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
 
     def on_output(self, buf):
-        os.write(self.fd, buf)
-        os.write(self.dup_fd, buf)
-        os.fsync(self.fd)
+        # Coalesce the chunks only if a chunk fills up the read buffer and
+        # contains no line break (or carriage return, used by progress bars),
+        # which indicates that more output is already waiting in the pipe.
+        # Even so, the output is held for at most `FLUSH_DELAY` seconds,
+        # such that the console output is not noticeably delayed.
+        with self._lock:
+            self._chunks.append(buf)
+            self._size += len(buf)
+            if self._size >= self.FLUSH_SIZE or len(buf) < self.read_size or \
+                    b'\n' in buf or b'\r' in buf:
+                self._flush()
+            elif self._timer is None:
+                self._timer = Timer(self.FLUSH_DELAY, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
 
 
 @contextmanager
@@ -254,6 +634,118 @@ def maybe_run_tensorboard(client_args, api, doc):
         yield None
 
 
+class VerifiedMounts(object):
+    """
+    Cache of the storage roots, which have been verified to be shared
+    with the MLStorage servers.
+
+    The cache is stored as a JSON file, mapping the host name and the
+    server URI to the verified storage root (i.e., the parent of the
+    experiment storage directory), the device number of the storage root,
+    and the verification timestamp.  Since the home directory is often
+    shared among hosts, the host name is included in the key, such that
+    the verification on one host is not trusted by the others.  The
+    device number is compared as well, such that a storage root which is
+    no longer mounted is not trusted.
+    """
+
+    def __init__(self, path=None, ttl=None):
+        """
+        Construct a new :class:`VerifiedMounts`.
+
+        Args:
+            path (str): Path of the cache file.  If not specified, will use
+                "~/.cache/mlstorage/verified_mounts.json".
+            ttl (float): Seconds for a verification to remain valid.
+                If not specified, will use
+                ``os.environ["MLSTORAGE_MOUNT_VERIFY_TTL"]``, or 3600.
+        """
+        if path is None:
+            path = os.path.join(os.path.expanduser('~'), '.cache',
+                                'mlstorage', 'verified_mounts.json')
+        if ttl is None:
+            ttl = float(os.environ.get('MLSTORAGE_MOUNT_VERIFY_TTL', 3600))
+        self.path = path
+        self.ttl = ttl
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                mounts = json_loads(f.read())
+        except (IOError, ValueError):
+            mounts = None
+        return mounts if isinstance(mounts, dict) else {}
+
+    @staticmethod
+    def _key(server):
+        return '{}|{}'.format(socket.gethostname(), server)
+
+    @staticmethod
+    def _storage_root(storage_dir):
+        return os.path.dirname(storage_dir.rstrip(os.path.sep))
+
+    def is_verified(self, server, storage_dir):
+        """
+        Check whether or not `storage_dir` is under a storage root, which
+        has been verified for `server` on this host within the TTL.
+
+        Args:
+            server (str): URI of the MLStorage server.
+            storage_dir (str): The experiment storage directory.
+
+        Returns:
+            bool: Whether or not the storage directory has been verified.
+        """
+        entry = self._load().get(self._key(server))
+        if not isinstance(entry, dict):
+            return False
+        root = entry.get('storage_root')
+        device = entry.get('device')
+        timestamp = entry.get('timestamp')
+        if not isinstance(root, str) or not isinstance(device, int) or \
+                not isinstance(timestamp, (int, float)) or \
+                time.time() - timestamp >= self.ttl:
+            return False
+        if not storage_dir.startswith(root.rstrip(os.path.sep) + os.path.sep):
+            return False
+        try:
+            return os.stat(root).st_dev == device
+        except OSError:
+            return False
+
+    def set_verified(self, server, storage_dir):
+        """
+        Mark the storage root of `storage_dir` as verified for `server`
+        on this host.
+
+        Args:
+            server (str): URI of the MLStorage server.
+            storage_dir (str): The experiment storage directory.
+        """
+        root = self._storage_root(storage_dir)
+        try:
+            device = os.stat(root).st_dev
+        except OSError:
+            return
+        mounts = self._load()
+        mounts[self._key(server)] = {
+            'storage_root': root,
+            'device': device,
+            'timestamp': time.time(),
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+            with open(temp_path, 'wb') as f:
+                f.write(orjson.dumps(mounts))
+            os.replace(temp_path, self.path)
+        except IOError:
+            getLogger(__name__).debug(
+                'Failed to save the verified mounts: %s', self.path,
+                exc_info=True
+            )
+
+
 def retry(func, tag, wait_intervals=(10, 30, 60, 120, 300)):
     for itv in wait_intervals:
         try:
@@ -290,7 +782,8 @@ def run_experiment(client_args):
     # establish connection to the server, and create the experiment
     api = ApiClientV1(client_args.server)
     doc = api.create(client_args.name, get_creation_doc(client_args))
-    cleanup_helper = CleanupHelper()
+    io_executor = ThreadPoolExecutor(max_workers=32)
+    cleanup_helper = CleanupHelper(io_executor)
     proc = None
     final_status_set = False
 
@@ -302,18 +795,26 @@ def run_experiment(client_args):
         logger.info('Work-dir: %s', storage_dir)
 
         # ensure the shared network file system works, by generating a
-        # random file, and try to get from the server
+        # random file, and try to get from the server.  This can be skipped
+        # if the storage root has been verified recently.
         os.makedirs(storage_dir, exist_ok=True)
-        needle_fn = str(uuid.uuid4()) + '.txt'
-        needle_path = os.path.join(storage_dir, needle_fn)
-        needle_content = str(uuid.uuid4()).encode('utf-8')
-        with open(needle_path, 'wb') as f:
-            f.write(needle_content)
-        remote_content = api.getfile(id, needle_fn)
-        if remote_content != needle_content:
-            raise ValueError('The content of remote file does not agree '
-                             'with the generated content.')
-        os.remove(needle_path)
+        verified_mounts = VerifiedMounts()
+        if client_args.force_verify_mount or \
+                not verified_mounts.is_verified(client_args.server,
+                                                storage_dir):
+            needle_fn = str(uuid.uuid4()) + '.txt'
+            needle_path = os.path.join(storage_dir, needle_fn)
+            needle_content = str(uuid.uuid4()).encode('utf-8')
+            with open(needle_path, 'wb') as f:
+                f.write(needle_content)
+            remote_content = api.getfile(id, needle_fn)
+            if remote_content != needle_content:
+                raise ValueError('The content of remote file does not agree '
+                                 'with the generated content.')
+            os.remove(needle_path)
+            verified_mounts.set_verified(client_args.server, storage_dir)
+        else:
+            logger.debug('Shared file system has been verified recently.')
 
         # construct the env dict
         env = get_environ_dict(client_args, id, storage_dir)
@@ -338,10 +839,11 @@ def run_experiment(client_args):
                     cleanup_helper.add(os.path.join(storage_dir, data_file))
 
         if client_args.config:
-            config_json = json.dumps(client_args.config, cls=JsonEncoder,
-                                     sort_keys=True, indent=2)
-            with codecs.open(os.path.join(storage_dir, 'config.json'),
-                             'wb', 'utf-8') as f:
+            config_json = JsonEncoder().dumps(
+                client_args.config,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2
+            )
+            with open(os.path.join(storage_dir, 'config.json'), 'wb') as f:
                 f.write(config_json)
 
         # scoped class for injecting TensorBoard webui
@@ -366,31 +868,19 @@ def run_experiment(client_args):
                     self.uri = None
 
         # run the program
-        heartbeat_job = HeartbeatJob('send heartbeat', api, doc)
-        config_job = CollectJsonDictJob(
-            'collect config', api, doc, filename='config.json',
-            field='config'
-        )
-        default_config_job = CollectJsonDictJob(
-            'collect default config', api, doc, filename='config.defaults.json',
-            field='default_config'
-        )
-        result_job = CollectJsonDictJob(
-            'collect result', api, doc, filename='result.json', field='result')
         tb_webui = TensorBoardWebUI()
-        webui_job = CollectJsonDictJob(
-            'collect webui', api, doc, filename='webui.json', field='webui',
-            postprocess=tb_webui.postprocess
-        )
+        poller_job = PollerJob('collect JSON and send heartbeat', api, doc, [
+            ('config.json', 'config'),
+            ('config.defaults.json', 'default_config'),
+            ('result.json', 'result'),
+            ('webui.json', 'webui', tb_webui.postprocess),
+        ])
 
         try:
             with maybe_run_tensorboard(client_args, api, doc) as tb_uri, \
                     tb_webui.set_uri(tb_uri), \
-                    heartbeat_job.run_in_background(), \
-                    config_job.run_in_background(), \
-                    default_config_job.run_in_background(), \
-                    result_job.run_in_background(), \
-                    webui_job.run_in_background(), \
+                    poller_job.run_in_background(), \
+                    poller_job.watch_files(), \
                     ConsoleDuplicator(storage_dir, 'console.log') as out_dup, \
                     exec_proc(client_args.args,
                               on_stdout=out_dup.on_output,
@@ -410,26 +900,46 @@ def run_experiment(client_args):
                 logger.debug('Process exited normally.')
 
         finally:
-            # collect the JSON dict for the last time
-            retry(lambda: webui_job.run_once(True),
-                  webui_job.name)
-            retry(lambda: config_job.run_once(True),
-                  config_job.name)
-            retry(lambda: default_config_job.run_once(True),
-                  default_config_job.name)
-            retry(lambda: result_job.run_once(True),
-                  result_job.name)
-            logger.debug('JSON file collected.')
-
-            # cleanup the working directory
-            cleanup_helper.cleanup()
-            logger.debug('Working directory cleanup finished.')
-
-            # compute the storage size and update the result
+            # collect the JSON dict for the last time, in a background thread,
+            # such that the network round-trips overlap with the local cleanup
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                collect_future = executor.submit(
+                    retry, lambda: poller_job.collect(force=True),
+                    'collect JSON'
+                )
+
+                # cleanup the working directory, except for the linked files
+                # to be collected, which must be kept until collected
+                deferred = cleanup_helper.cleanup(keep=[
+                    os.path.join(storage_dir, c.filename)
+                    for c in poller_job.collectors
+                ])
+                if not deferred:
+                    logger.debug('Working directory cleanup finished.')
+
+                # compute the storage size
+                if proc is not None and not deferred:
+                    storage_size = compute_fs_size(
+                        storage_dir, executor=io_executor)
+
+                try:
+                    collect_future.result()
+                finally:
+                    poller_job.close()
+                logger.debug('JSON file collected.')
+
+            if deferred:
+                cleanup_helper.cleanup()
+                logger.debug('Working directory cleanup finished.')
+                if proc is not None:
+                    storage_size = compute_fs_size(
+                        storage_dir, executor=io_executor)
+
+            # update the result
             if proc is not None:
                 result_dict = {
                     'exit_code': proc.poll(),
-                    'storage_size': compute_fs_size(storage_dir)
+                    'storage_size': storage_size
                 }
                 retry(lambda: api.set_finished(id, 'COMPLETED', result_dict),
                       'store the experiment result')
@@ -453,3 +963,5 @@ def run_experiment(client_args):
         if client_args.debug:
             retry(lambda: api.delete(doc['id']), 'cleanup debugging experiment')
             logger.debug('Experiment deleted.')
+        io_executor.shutdown()
+        api.close()
@@ -1,5 +1,6 @@
 import re
 from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime
 
 import bson
@@ -15,6 +16,10 @@ __all__ = [
 
 EXPERIMENT_STATUSES = ['RUNNING', 'COMPLETED', 'FAILED']
 
+# the same experiment IDs are validated over and over again by the heartbeat
+# and the collectors, thus we cache the parsed ObjectId of each ID text
+_parse_object_id = lru_cache(maxsize=1024)(ObjectId)
+
 
 def validate_experiment_id(id):
     """
@@ -31,7 +36,7 @@ def validate_experiment_id(id):
     """
     try:
         if not isinstance(id, ObjectId):
-            id = ObjectId(str(id))
+            id = _parse_object_id(str(id))
         return id
     except bson.errors.InvalidId:
         raise ValueError('Invalid experiment ID: {!r}'.format(id))
@@ -134,6 +139,7 @@ _PATH_SEP_SPLITTER = re.compile(r'[/\\]')
 _INVALID_PATH_CHARS = re.compile(r'[<>:"|?*]')
 
 
+@lru_cache(maxsize=1024)
 def validate_relpath(path):
     """
     Validate the `path`, enforcing `path` to be relative, translating "\\"
@@ -1,9 +1,11 @@
 import hashlib
 import os
-import re
 import shutil
 import stat
+import struct
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from logging import getLogger
 
 from mlstorage_client.schema import validate_relpath
@@ -11,13 +13,19 @@ from mlstorage_client.schema import validate_relpath
 __all__ = [
     'copy_or_link',  'clone_file_or_dir',
     'collect_relative_files', 'is_script_file',
-    'fingerprint_for_files', 'compute_fs_size',
+    'fingerprint_for_files', 'clear_fingerprint_cache', 'compute_fs_size',
 ]
 
-_SCRIPT_FILE_PATTERN = re.compile(
-    r'.*\.(py|pl|rb|js|sh|r|bat|cmd|exe|jar)$',
-    flags=re.IGNORECASE
-)
+_file_digest = getattr(hashlib, 'file_digest', None)
+_copy_file_range = getattr(os, 'copy_file_range', None)
+
+# (algorithm, path, st_dev, st_ino, st_mtime_ns, st_size) -> digest of the
+# file, where `path` is the exact string hashed in the file header
+_digest_cache = {}
+_DIGEST_CACHE_SIZE = 65536
+
+_SCRIPT_FILE_EXTS = (
+    '.py', '.pl', '.rb', '.js', '.sh', '.r', '.bat', '.cmd', '.exe', '.jar')
 
 
 def copy_or_link(source, target, symlink=True):
@@ -37,7 +45,51 @@ def copy_or_link(source, target, symlink=True):
     if symlink and sys.platform != 'win32':
         os.symlink(source, target)
     else:
-        shutil.copy(source, target)
+        # Hard links are not used, since the copy must not change along
+        # with the source.
+        _copy_file(source, target)
+        shutil.copystat(source, target)
+
+
+def _copy_file(source, target):
+    # `copy_file_range` (Linux) copies in the kernel, and may share the
+    # extents of the source file on btrfs / xfs (reflink), instead of
+    # copying the bytes.  `shutil.copyfile` is the fallback, which still
+    # copies via `sendfile` / `fcopyfile` where available.
+    # Opening the target for writing would truncate the source if they
+    # are the same file, so this must be checked beforehand.
+    if os.path.exists(target) and os.path.samefile(source, target):
+        raise shutil.SameFileError(
+            '{!r} and {!r} are the same file'.format(source, target))
+    if _copy_file_range is not None:
+        try:
+            if _copy_file_range_all(source, target):
+                return
+        except OSError:
+            # e.g., not supported across file systems on older kernels,
+            # or not supported by the file system at all
+            pass
+    # `shutil.copyfile` truncates and re-writes the target
+    shutil.copyfile(source, target)
+
+
+def _copy_file_range_all(source, target):
+    # Returns whether or not the whole file has been copied.  Files which
+    # report zero size (e.g., those in /proc) are left to the fallback,
+    # since `copy_file_range` may copy nothing from them.
+    with open(source, 'rb') as src:
+        size = os.fstat(src.fileno()).st_size
+        if size <= 0:
+            return False
+        with open(target, 'wb') as dst:
+            copied = 0
+            while True:
+                n = _copy_file_range(src.fileno(), dst.fileno(),
+                                     max(size - copied, 1024 * 1024))
+                if n <= 0:
+                    break
+                copied += n
+    return copied >= size
 
 
 def clone_file(source_file, target_path, work_dir, symlink=True):
@@ -58,8 +110,8 @@ def clone_file(source_file, target_path, work_dir, symlink=True):
     copy_or_link(source_file, full_target_path, symlink=symlink)
 
 
-_CLONE_SKIP_PATTERN = re.compile(
-    r'^(\.git|\.svn|\.cvs|\.hg|\.DS_Store|\.directory|Thumbs\.db)$')
+_CLONE_SKIP_NAMES = frozenset([
+    '.git', '.svn', '.cvs', '.hg', '.DS_Store', '.directory', 'Thumbs.db'])
 
 
 def clone_dir(source_dir, target_path, work_dir, symlink=True):
@@ -74,18 +126,23 @@ def clone_dir(source_dir, target_path, work_dir, symlink=True):
         symlink: Whether to use symbolic link if possible.
             (default :obj:`True`)
     """
-    for name in os.listdir(source_dir):
-        if _CLONE_SKIP_PATTERN.match(name):
-            continue
-        src_path = os.path.join(source_dir, name)
-        dst_path = os.path.join(target_path, name)
-        dst_fullpath = os.path.join(work_dir, dst_path)
-        if os.path.isdir(src_path):
-            os.makedirs(dst_fullpath, exist_ok=True)
-            clone_dir(src_path, dst_path, work_dir, symlink)
-        else:
-            copy_or_link(src_path, dst_fullpath, symlink=symlink)
-            getLogger(__name__).debug('Cloned file: %s', src_path)
+    stack = [(source_dir, target_path)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                if entry.name in _CLONE_SKIP_NAMES:
+                    continue
+                dst_path = os.path.join(dst_dir, entry.name)
+                dst_fullpath = os.path.join(work_dir, dst_path)
+                # `is_dir` follows symbolic links as `os.path.isdir` does,
+                # but answers from the d_type of readdir for regular entries
+                if entry.is_dir():
+                    os.makedirs(dst_fullpath, exist_ok=True)
+                    stack.append((entry.path, dst_path))
+                else:
+                    copy_or_link(entry.path, dst_fullpath, symlink=symlink)
+                    getLogger(__name__).debug('Cloned file: %s', entry.path)
 
 
 def clone_file_or_dir(source_path, target_path, work_dir, symlink=True):
@@ -121,18 +178,22 @@ def collect_relative_files(args, start_path):
     Returns:
         list[str]: The relative paths of the discovered files or directories.
     """
-    start_path = os.path.abspath(start_path)
+    # same as `os.path.abspath`, but without querying `os.getcwd` per arg
+    cwd = os.getcwd()
+    start_path = os.path.normpath(os.path.join(cwd, start_path))
     ret = []
     for arg in args:
-        arg_path = os.path.abspath(arg)
+        arg_path = os.path.normpath(os.path.join(cwd, arg))
         try:
             arg_relpath = validate_relpath(
                 os.path.relpath(arg_path, start_path))
         except ValueError:
-            pass
-        else:
-            if os.path.exists(arg_path):  # for both files and directories
-                ret.append(arg_relpath)
+            continue
+        try:
+            os.stat(arg_path)  # for both files and directories
+        except (OSError, ValueError):
+            continue
+        ret.append(arg_relpath)
     return ret
 
 
@@ -147,23 +208,42 @@ def is_script_file(path, start_path):
     Returns:
         bool: Whether or not `path` is a script file.
     """
-    return _SCRIPT_FILE_PATTERN.match(path) is not None and \
+    return path.lower().endswith(_SCRIPT_FILE_EXTS) and \
         os.path.isfile(os.path.join(start_path, path))
 
 
-def fingerprint_for_files(file_list, root_dir, algorithm=hashlib.sha1,
-                          buffer_size=16*1024):
+def fingerprint_for_files(file_list, root_dir, algorithm=hashlib.sha256,
+                          buffer_size=1024*1024, max_workers=8):
     """
     Compute the fingerprint for specified `file_list`.
 
+    Each file is hashed into an independent digest (in a thread pool if
+    there are multiple files), and the digests are then combined
+    in the sorted order of the file names.  The digests are cached in
+    memory by ``(path, device, inode, mtime, size)``, so unchanged files
+    are not read again by later calls.
+
+    Note that a file re-written with the same size within the timestamp
+    granularity of the file system (which might be coarser than
+    nanoseconds) is indistinguishable from an unchanged file, and the
+    stale digest would be used.  Call :func:`clear_fingerprint_cache`
+    before computing the fingerprint if files might have been modified
+    this way, e.g., between two experiments run in the same process.
+
     Args:
         file_list (Iterable[str]): List of relative paths of the files.
             These paths will also be used in computing the fingerprint,
             so they should be normalized (i.e., use "/" instead of "\\"
             on Windows, eliminate "." and reduce ".." to minimal form).
         root_dir (str): The root directory of all the files.
-        algorithm: The hash algorithm. (default ``hashlib.sha1``)
-        buffer_size: Size of IO buffer. (default ``16*1024``)
+        algorithm: The hash algorithm.  The default SHA-256 is dispatched by
+            OpenSSL to the SHA extensions of the CPU (Intel SHA-NI, ARMv8
+            Crypto) when available, which is faster than SHA-1 in software.
+            (default ``hashlib.sha256``)
+        buffer_size: Size of IO buffer, used only if ``hashlib.file_digest``
+            is not available (before Python 3.11). (default ``1024*1024``)
+        max_workers (int): Maximum number of threads for hashing the files.
+            (default 8)
 
     Returns:
         str: The computed fingerprint, or None if `file_list` is empty.
@@ -172,42 +252,136 @@ def fingerprint_for_files(file_list, root_dir, algorithm=hashlib.sha1,
     if not file_list:
         return None
 
+    paths = [os.path.join(root_dir, name) for name in file_list]
+    get_buffer = _thread_buffer(buffer_size)
+    if len(paths) > 1 and max_workers > 1:
+        # the hash objects from OpenSSL release the GIL when consuming large
+        # buffers, so the threads can overlap both IO and hashing
+        max_workers = min(max_workers, os.cpu_count() or 1, len(paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            digests = list(executor.map(
+                lambda p: _hash_file(p, algorithm, get_buffer), paths))
+    else:
+        digests = [_hash_file(p, algorithm, get_buffer) for p in paths]
+
     h = algorithm()
-    for name in file_list:
-        path = os.path.join(root_dir, name)
-        st = os.stat(path, follow_symlinks=True)
-
-        # consume file header
-        head = '|'.join([str(v) for v in (len(path), path, st.st_size)])
-        if not isinstance(head, bytes):
-            head = head.encode('utf-8')
-        h.update(head)
-
-        # consume file content
-        with open(path, 'rb') as f:
-            while True:
-                buf = f.read(buffer_size)
-                if not buf:
-                    break
-                h.update(buf)
+    for digest in digests:
+        h.update(struct.pack('>I', len(digest)) + digest)
     return h.hexdigest()
 
 
-def compute_fs_size(path):
+def clear_fingerprint_cache():
+    """Clear the cached file digests of :func:`fingerprint_for_files`."""
+    _digest_cache.clear()
+
+
+def _thread_buffer(buffer_size):
+    # each thread allocates its IO buffer once, on the first file it reads
+    local = threading.local()
+
+    def get_buffer():
+        buf = getattr(local, 'buf', None)
+        if buf is None:
+            buf = local.buf = bytearray(buffer_size)
+        return buf
+
+    return get_buffer
+
+
+def _hash_file(path, algorithm, get_buffer):
+    st = os.stat(path, follow_symlinks=True)
+    # the digest covers the header, thus the key must contain the same
+    # `path` string as the header, while (st_dev, st_ino) identify the file
+    key = (algorithm, path, st.st_dev, st.st_ino, st.st_mtime_ns,
+           st.st_size)
+    digest = _digest_cache.get(key)
+    if digest is not None:
+        return digest
+
+    h = algorithm()
+
+    # consume file header
+    head = '|'.join([str(v) for v in (len(path), path, st.st_size)])
+    if not isinstance(head, bytes):
+        head = head.encode('utf-8')
+    h.update(head)
+
+    # consume file content
+    buf = get_buffer() if _file_digest is None else None
+    with open(path, 'rb') as f:
+        _hash_file_content(h, f, buf)
+    digest = h.digest()
+
+    if len(_digest_cache) >= _DIGEST_CACHE_SIZE:
+        _digest_cache.clear()
+    _digest_cache[key] = digest
+    return digest
+
+
+def _hash_file_content(h, f, buf):
+    # `hashlib.file_digest` (Python 3.11+) reads the file into a reused
+    # buffer and feeds it to the hash object.  It only requires the "digest"
+    # factory to return an object with `update`, so the hash object which
+    # has already consumed the file header can be passed in directly.
+    if _file_digest is not None:
+        _file_digest(f, lambda: h)
+    else:
+        view = memoryview(buf)
+        while True:
+            size = f.readinto(buf)
+            if not size:
+                break
+            h.update(view[:size])
+
+
+def _scan_dir_size(path):
+    # `DirEntry.is_dir` answers from the d_type of readdir, and the result
+    # of `DirEntry.stat` is cached on the entry, so each entry costs at most
+    # one lstat
+    size = 0
+    sub_dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            size += entry.stat(follow_symlinks=False).st_size
+            if entry.is_dir(follow_symlinks=False):
+                sub_dirs.append(entry.path)
+    return size, sub_dirs
+
+
+def compute_fs_size(path, executor=None):
     """
     Sum up the file system size of `path`.
 
     Args:
         path (str): The path to be analyzed.
+        executor (concurrent.futures.Executor): If specified, scan the
+            directories in parallel with this executor.  This is useful
+            on network file systems, where each stat costs a round-trip.
+            (default :obj:`None`)
 
     Returns:
         int: The size of `path` in bytes.
     """
     st = os.stat(path, follow_symlinks=False)
-    if stat.S_ISDIR(st.st_mode):
-        return st.st_size + sum(
-            compute_fs_size(os.path.join(path, name))
-            for name in os.listdir(path)
-        )
-    else:
+    if not stat.S_ISDIR(st.st_mode):
         return st.st_size
+    elif executor is None:
+        # iterative walk, to avoid hitting the recursion limit on deep trees
+        total = st.st_size
+        stack = [path]
+        while stack:
+            size, sub_dirs = _scan_dir_size(stack.pop())
+            total += size
+            stack.extend(sub_dirs)
+        return total
+    else:
+        total = st.st_size
+        pending = {executor.submit(_scan_dir_size, path)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                size, sub_dirs = future.result()
+                total += size
+                for sub_dir in sub_dirs:
+                    pending.add(executor.submit(_scan_dir_size, sub_dir))
+        return total
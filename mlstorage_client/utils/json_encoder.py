@@ -1,10 +1,12 @@
 from datetime import datetime
 import json
+import types
 
+import orjson
 from bson import ObjectId
 from pytz import UTC
 
-__all__ = ['JsonEncoder']
+__all__ = ['JsonEncoder', 'json_loads']
 
 
 class JsonEncoder(json.JSONEncoder):
@@ -15,30 +17,121 @@ class JsonEncoder(json.JSONEncoder):
     def __init__(self, use_timestamp=False, **kwargs):
         super(JsonEncoder, self).__init__(**kwargs)
         self.use_timestamp = use_timestamp
+        self._type_handler_cache = dict(self.TYPE_HANDLERS)
+
+    def _encode_datetime(self, o):
+        if self.use_timestamp:
+            # we only use UTC datetime through out this project
+            return o.replace(tzinfo=UTC).timestamp()
+        else:
+            return o.isoformat()
+
+    def _encode_object_id(self, o):
+        return str(o)
+
+    def _encode_bytes(self, o):
+        try:
+            return o.decode('utf-8')
+        except UnicodeDecodeError:
+            return repr(o)
+
+    #: Dict of object serialization handlers, keyed by the object types.
+    #: Instances of the subclasses of these types are also handled.
+    TYPE_HANDLERS = {
+        datetime: _encode_datetime,
+        ObjectId: _encode_object_id,
+        bytes: _encode_bytes,
+    }
+
+    #: Max number of the resolved subclasses cached by each encoder.
+    TYPE_HANDLER_CACHE_SIZE = 256
+
+    def _get_type_handler(self, t):
+        try:
+            return self._type_handler_cache[t]
+        except KeyError:
+            pass
+        handler = None
+        for base, h in self.TYPE_HANDLERS.items():
+            if issubclass(t, base):
+                handler = h
+                break
+        if len(self._type_handler_cache) < self.TYPE_HANDLER_CACHE_SIZE:
+            self._type_handler_cache[t] = handler
+        return handler
+
+    #: The value returned by an object serialization handler, if the handler
+    #: does not handle the object.
+    UNHANDLED = object()
 
     def _default_object_handler(self, o):
-        if isinstance(o, datetime):
-            if self.use_timestamp:
-                # we only use UTC datetime through out this project
-                yield o.replace(tzinfo=UTC).timestamp()
-            else:
-                yield o.isoformat()
-        elif isinstance(o, ObjectId):
-            yield str(o)
-        elif isinstance(o, bytes):
-            try:
-                yield o.decode('utf-8')
-            except UnicodeDecodeError:
-                yield repr(o)
-
-    #: List of object serialization handlers
-    OBJECT_HANDLERS = [_default_object_handler]
+        handler = self._get_type_handler(type(o))
+        if handler is not None:
+            return handler(self, o)
+        return self.UNHANDLED
+
+    #: List of object serialization handlers, for the objects not handled
+    #: by `TYPE_HANDLERS`.  Each handler should return the converted object,
+    #: or `UNHANDLED` if it does not handle the object.
+    OBJECT_HANDLERS = []
 
     def default(self, o):
+        handler = self._get_type_handler(type(o))
+        if handler is not None:
+            return handler(self, o)
         for handler in self.OBJECT_HANDLERS:
-            for obj in handler(self, o):
+            obj = handler(self, o)
+            if isinstance(obj, types.GeneratorType):
+                # legacy handlers, which yield the converted object
+                obj = next(obj, self.UNHANDLED)
+            if obj is not self.UNHANDLED:
                 return obj
         return super(JsonEncoder, self).default(o)
 
     def encode(self, o):
         return super(JsonEncoder, self).encode(o)
+
+    def dumps(self, o, option=0):
+        """
+        Serialize `o` into JSON bytes with :mod:`orjson`.
+
+        Unlike :meth:`encode`, the object graph is walked by :mod:`orjson`
+        in native code, and only the objects it does not support natively
+        (plus the datetime objects, if `use_timestamp` is :obj:`True`) are
+        passed to :meth:`default`.  Also, NaN and Infinity are serialized
+        as ``null`` rather than the non-standard literals.
+
+        Args:
+            o: The object to be serialized.
+            option (int): Additional :mod:`orjson` options, for example,
+                ``orjson.OPT_SORT_KEYS``.  (default 0)
+
+        Returns:
+            bytes: The serialized JSON.
+        """
+        option |= orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.use_timestamp:
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(o, default=self.default, option=option)
+
+
+def json_loads(raw):
+    """
+    Parse JSON from `raw` bytes, using :mod:`orjson` for speed.
+
+    Falls back to :func:`json.loads` if :mod:`orjson` rejects the content,
+    since the standard library also accepts non-standard literals like
+    ``NaN`` and ``Infinity``, which Python programs may produce.
+
+    Args:
+        raw (bytes or bytearray or memoryview or str): The JSON content.
+
+    Returns:
+        The parsed object.
+    """
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        if isinstance(raw, (bytearray, memoryview)):
+            raw = bytes(raw)
+        return json.loads(raw)
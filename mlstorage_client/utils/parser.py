@@ -1,9 +1,10 @@
-import codecs
-import json
+import os
 import re
 
 import pyparsing as pp
 
+from mlstorage_client.utils.json_encoder import json_loads
+
 __all__ = [
     'Tokens',
     'parse_config', 'parse_config_file',
@@ -43,6 +44,103 @@ class Tokens(object):
     tag_list = pp.Optional(tag + pp.ZeroOrMore(comma + tag))
 
 
+# Packrat parsing (`ParserElement.enablePackrat`) is not enabled: the memo
+# is reset on every `parseString`, and these grammars have little to reuse
+# within a single short string, so it turns out to be slower.
+_KV_PARSE = Tokens.key_value_pair_list.parseString
+_TAG_PARSE = Tokens.tag_list.parseString
+
+# The grammars of `Tokens` are also implemented by the following hand-written
+# scanner, which is much faster than pyparsing.  The pyparsing grammars can
+# still be used by setting ``MLSTORAGE_USE_PYPARSING=1``.
+_USE_PYPARSING = os.environ.get('MLSTORAGE_USE_PYPARSING', '').lower() in \
+    ('1', 'on', 'true', 'yes')
+
+_WHITESPACE = ' \t\n\r'  # the default whitespace chars of pyparsing
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+_IDENTIFIER_RE = re.compile('[{}][{}]*'.format(
+    *(re.escape(''.join(sorted(chars)))
+      for chars in (Tokens.identifier.initChars, Tokens.identifier.bodyChars))
+))
+_INTEGER_RE = re.compile(r'[+-]?\d+')
+_REAL_RE = re.compile(
+    r'[+-]?(?:\d+[eE][+-]?\d+|(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+_TRUE_LITERALS = frozenset(['True', 'true', 'yes', 'on'])
+_FALSE_LITERALS = frozenset(['False', 'false', 'no', 'off'])
+_QUOTED_STRING_RE = re.compile(r'"((?:\\.|[^"\n\r\\])*)"')
+_QUOTED_ESCAPE_RE = re.compile(r'\\(.)')
+_ESCAPED_WHITESPACES = {'t': '\t', 'n': '\n', 'f': '\f', 'r': '\r'}
+_UNQUOTED_STRING_RE = re.compile(r'[^\[\]{},]*')
+
+
+def _syntax_error(text, pos, expected):
+    return ValueError('Syntax error at char {}, expected {}: {!r}'.
+                      format(pos, expected, text))
+
+
+def _unescape(m):
+    c = m.group(1)
+    return _ESCAPED_WHITESPACES.get(c, c)
+
+
+def _scan_string(text, pos):
+    # `Tokens.quoted_string | Tokens.unquoted_string | Tokens.empty_value`
+    start = _WHITESPACE_RE.match(text, pos).end()
+    m = _QUOTED_STRING_RE.match(text, start)
+    if m:
+        value = m.group(1)
+        if '\\' in value:
+            value = _QUOTED_ESCAPE_RE.sub(_unescape, value)
+        return value, m.end()
+    m = _UNQUOTED_STRING_RE.match(text, pos)
+    return m.group().strip(), m.end()
+
+
+def _scan_config_value(text, pos):
+    # `Tokens.config_value`: the number and boolean literals must be
+    # followed by a delimiter or the end of text, so they must match the
+    # whole unquoted token
+    m = _UNQUOTED_STRING_RE.match(text, _WHITESPACE_RE.match(text, pos).end())
+    token = m.group().rstrip(_WHITESPACE)
+    if _INTEGER_RE.fullmatch(token):
+        return int(token), m.end()
+    if _REAL_RE.fullmatch(token):
+        return float(token), m.end()
+    if token in _TRUE_LITERALS:
+        return True, m.end()
+    if token in _FALSE_LITERALS:
+        return False, m.end()
+    return _scan_string(text, pos)
+
+
+def _scan_key_value_pair(text, pos):
+    # `Tokens.key_value_pair`
+    pos = _WHITESPACE_RE.match(text, pos).end()
+    m = _IDENTIFIER_RE.match(text, pos)
+    if not m:
+        raise _syntax_error(text, pos, 'identifier')
+    pos = _WHITESPACE_RE.match(text, m.end()).end()
+    if not text.startswith('=', pos):
+        raise _syntax_error(text, pos, '"="')
+    value, pos = _scan_config_value(text, pos + 1)
+    return (m.group(), value), pos
+
+
+def _scan_list(text, scan_item):
+    # `item + ZeroOrMore(comma + item)`, which must consume the whole text
+    ret = []
+    pos = 0
+    while True:
+        item, pos = scan_item(text, pos)
+        ret.append(item)
+        pos = _WHITESPACE_RE.match(text, pos).end()
+        if pos == len(text):
+            return ret
+        if text[pos] != ',':
+            raise _syntax_error(text, pos, '","')
+        pos += 1
+
+
 def parse_config(config_text):
     """
     Parse configuration text like ``name1=value1,name2=value2`` into
@@ -53,9 +151,21 @@ def parse_config(config_text):
 
     Returns:
         dict[str, any]: The parsed configuration dict.
+
+    Raises:
+        ValueError: If `config_text` has syntax error.
     """
-    t = Tokens.key_value_pair_list
-    return dict(t.parseString(config_text, parseAll=True).asList())
+    if _USE_PYPARSING:
+        try:
+            return dict(_KV_PARSE(config_text, parseAll=True).asList())
+        except pp.ParseException as ex:
+            raise ValueError(str(ex))
+
+    # pyparsing expands the tabs before parsing, so do we
+    config_text = config_text.expandtabs()
+    if not config_text.strip(_WHITESPACE):
+        return {}
+    return dict(_scan_list(config_text, _scan_key_value_pair))
 
 
 def parse_config_file(config_file):
@@ -68,11 +178,11 @@ def parse_config_file(config_file):
     Returns:
         dict[str, any]: The parsed configuration dict.
     """
-    with codecs.open(config_file, 'rb', 'utf-8') as f:
-        config_dict = json.loads(f.read().strip())
-        if not isinstance(config_dict, dict):
-            raise ValueError('Config file does not contain a dict: {}'.
-                             format(config_file))
+    with open(config_file, 'rb') as f:
+        config_dict = json_loads(f.read())
+    if not isinstance(config_dict, dict):
+        raise ValueError('Config file does not contain a dict: {}'.
+                         format(config_file))
     return config_dict
 
 
@@ -85,9 +195,18 @@ def parse_tags(tags_text):
 
     Returns:
         list[str]: The parsed tags.
+
+    Raises:
+        ValueError: If `tags_text` has syntax error.
     """
-    t = Tokens.tag_list
-    return [s for s in t.parseString(tags_text, parseAll=True).asList() if s]
+    if _USE_PYPARSING:
+        try:
+            tags = _TAG_PARSE(tags_text, parseAll=True).asList()
+        except pp.ParseException as ex:
+            raise ValueError(str(ex))
+    else:
+        tags = _scan_list(tags_text.expandtabs(), _scan_string)
+    return [s for s in tags if s]
 
 
 _KV_PATTERN = re.compile(r'^\s*([^=]+?)\s*=\s*(.*?)\s*$')
@@ -130,11 +249,15 @@ def parse_env_file(path):
     Returns:
         dict[str, str]: The parsed env dict.
     """
+    # read the whole file at once with the built-in decoder, instead of
+    # iterating through the lines via the `codecs` stream reader.
+    # `str.splitlines` splits at the same line boundaries as the latter.
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
     ret = {}
-    with codecs.open(path, 'rb', 'utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                name, val = parse_env(line)
-                ret[name] = val
+    for line in text.splitlines():
+        line = line.strip()
+        if line and line[0] != '#':
+            name, val = parse_env(line)
+            ret[name] = val
     return ret
@@ -2,12 +2,25 @@ import os
 import re
 import socket
 from contextlib import contextmanager
+from functools import lru_cache
 from queue import Queue, Empty
 
 from mlstorage_client.utils import exec_proc
 
 __all__ = ['run_tensorboard']
 
+_TB_URL_PATTERN = re.compile(br'TensorBoard \S+ at http://([^:]+):(\d+)')
+_TB_URL_WINDOW = 4096  # max number of bytes kept for searching the url
+
+
+@lru_cache(maxsize=1)
+def _local_ip():
+    # resolving the host name might take a DNS round-trip, so cache it
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except socket.gaierror:
+        return '127.0.0.1'
+
 
 @contextmanager
 def run_tensorboard(path, log_file=None, host='0.0.0.0', port=0, timeout=30):
@@ -26,17 +39,19 @@ def run_tensorboard(path, log_file=None, host='0.0.0.0', port=0, timeout=30):
     Yields:
         str: The URI of the launched TensorBoard.
     """
-    def capture_output(data, fout, headbuf,
-                       pattern=re.compile(br'TensorBoard \S+ at '
-                                          br'http://([^:]+):(\d+)')):
+    def capture_output(data, fout, headbuf):
         if headbuf:
-            headbuf[0] = headbuf[0] + data
-            m = pattern.search(headbuf[0])
-            if m:
+            buf = headbuf[0] + data
+            m = _TB_URL_PATTERN.search(buf)
+            if not m:
+                # only keep the tail of the output, which might contain the
+                # beginning of the url line, so the next search is bounded
+                headbuf[0] = buf[-_TB_URL_WINDOW:]
+            else:
                 url_host = m.group(1).decode('utf-8')
                 url_port = m.group(2).decode('utf-8')
                 if not url_host or (url_host in ('0.0.0.0', '::0')):
-                    url_host = socket.gethostbyname(socket.gethostname())
+                    url_host = _local_ip()
                 the_url = 'http://{}:{}'.format(url_host, url_port)
                 url_q.put(the_url)
                 del headbuf[:]
@@ -53,6 +68,7 @@ def run_tensorboard(path, log_file=None, host='0.0.0.0', port=0, timeout=30):
             yield None
 
     url_q = Queue()
+    headbuf = [b'']  # the output to search for the url, cleared once found
     args = ['tensorboard',
             '--logdir', path,
             '--host', host,
@@ -63,7 +79,7 @@ def run_tensorboard(path, log_file=None, host='0.0.0.0', port=0, timeout=30):
     with maybe_open_log() as log_f, \
             exec_proc(args,
                       on_stdout=lambda data: capture_output(
-                          data, fout=log_f, headbuf=[b'']
+                          data, fout=log_f, headbuf=headbuf
                       ),
                       stderr_to_stdout=True,
                       env=env):
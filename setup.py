@@ -23,13 +23,15 @@ _source_dir = os.path.split(os.path.abspath(__file__))[0]
 version = str(ast.literal_eval(_version_re.search(
     read_file(os.path.join(_source_dir, 'mlstorage_client/__init__.py'))).group(1)))
 
-requirements_list = list(filter(
-    lambda v: v and not v.startswith('#'),
-    (s.strip() for s in read_file(
-        os.path.join(_source_dir, 'requirements.txt')).split('\n'))
-))
-dependency_links = [s for s in requirements_list if s.startswith('git+')]
-install_requires = [s for s in requirements_list if not s.startswith('git+')]
+install_requires = []
+dependency_links = []
+for s in read_file(os.path.join(_source_dir, 'requirements.txt')).splitlines():
+    s = s.strip()
+    if s and not s.startswith('#'):
+        if s.startswith('git+'):
+            dependency_links.append(s)
+        else:
+            install_requires.append(s)
 
 
 setup(
@@ -48,6 +50,9 @@ setup(
     platforms='any',
     setup_requires=['setuptools'],
     install_requires=install_requires,
+    extras_require={
+        'watch': ['watchdog >= 0.9.0'],
+    },
     dependency_links=dependency_links,
     classifiers=[
         'Development Status :: 2 - Alpha',
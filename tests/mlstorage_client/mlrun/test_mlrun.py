@@ -0,0 +1,82 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from mlstorage_client.mlrun import mlrun, run_from_dict
+
+
+class MlrunTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tempdir = TemporaryDirectory()
+        self.tempdir = os.path.realpath(self._tempdir.name)
+        os.chdir(self.tempdir)
+        os.makedirs('nets')
+        for name in ('nets/train.py', 'data.txt'):
+            with open(name, 'w') as f:
+                f.write('# {}\n'.format(name))
+        env = patch.dict(os.environ)
+        env.start()
+        self.addCleanup(env.stop)
+        os.environ.pop('MLSTORAGE_EXPERIMENT_ID', None)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tempdir.cleanup()
+
+    def test_run_from_dict(self):
+        with patch('mlstorage_client.mlrun.run_experiment') as run:
+            run_from_dict({
+                'server': 'http://localhost:8080',
+                'tags': ['b, a', 'a, c'],
+                'config': ['max_epoch=10'],
+                'env': ['FOO=BAR'],
+                'gpu': ['1,10', '2'],
+                'tensorboard': True,
+                'tensorboard_port': 6006,
+                'args': ['python', 'nets/train.py', 'data.txt'],
+            })
+        self.assertEqual(run.call_count, 1)
+        client_args = run.call_args[0][0]
+        self.assertIsNone(client_args.parent_id)
+        self.assertEqual(client_args.name, 'nets/train.py')
+        self.assertListEqual(client_args.tags, ['b', 'a', 'c'])
+        self.assertDictEqual(client_args.config, {'max_epoch': 10})
+        self.assertDictEqual(
+            client_args.env,
+            {'FOO': 'BAR', 'CUDA_VISIBLE_DEVICES': '1,2,10'}
+        )
+        self.assertIsNotNone(client_args.fingerprint)
+        self.assertEqual(client_args.server, 'http://localhost:8080')
+        self.assertEqual(client_args.tensorboard, (None, 6006))
+        self.assertListEqual(
+            list(client_args.args), ['python', 'nets/train.py', 'data.txt'])
+        self.assertEqual(client_args.cwd, self.tempdir)
+        self.assertSetEqual(client_args.script_files, {'nets/train.py'})
+        self.assertSetEqual(client_args.data_files, {'data.txt'})
+
+    def test_invalid_args(self):
+        with patch('mlstorage_client.mlrun.run_experiment') as run:
+            with self.assertRaisesRegex(ValueError,
+                                        'must be HTTP or HTTPS uri'):
+                run_from_dict({'server': 'ftp://localhost',
+                               'args': ['python', 'nets/train.py']})
+            with self.assertRaisesRegex(ValueError,
+                                        'must specify program arguments'):
+                run_from_dict({'server': 'http://localhost'})
+            with self.assertRaisesRegex(ValueError,
+                                        'Cannot infer the experiment name'):
+                run_from_dict({'server': 'http://localhost',
+                               'args': ['cat', 'data.txt']})
+
+            # the command line entry reports the error and exits
+            result = CliRunner().invoke(
+                mlrun, ['-s', 'http://localhost', '--', 'cat', 'data.txt'])
+            self.assertEqual(result.exit_code, -1)
+            self.assertIn('Cannot infer the experiment name', result.output)
+
+        self.assertFalse(run.called)
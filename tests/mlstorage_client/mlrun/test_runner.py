@@ -0,0 +1,380 @@
+import json
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory, TemporaryFile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from mlstorage_client.mlrun.runner import (CleanupHelper, CronJob,
+                                           JsonDictCollector, JsonFileWatcher,
+                                           PollerJob, ConsoleDuplicator,
+                                           VerifiedMounts)
+
+
+class StubApi(object):
+
+    def __init__(self, reject_field=None):
+        self.reject_field = reject_field
+        self.updates = []
+        self.heartbeats = 0
+
+    def update(self, id, fields):
+        if self.reject_field in fields:
+            raise RuntimeError('rejected')
+        self.updates.append(dict(fields))
+
+    def heartbeat(self, id):
+        self.heartbeats += 1
+
+
+def write_json(path, obj):
+    with open(path, 'w') as f:
+        f.write(json.dumps(obj))
+
+
+class CleanupHelperTestCase(unittest.TestCase):
+
+    def test_keep(self):
+        with TemporaryDirectory() as tempdir:
+            paths = [os.path.join(tempdir, n)
+                     for n in ('a.txt', 'config.json', 'result.json')]
+            for path in paths:
+                write_json(path, {})
+            helper = CleanupHelper()
+            for path in paths:
+                helper.add(path)
+
+            kept = helper.cleanup(keep=[paths[1], paths[2],
+                                        os.path.join(tempdir, 'x.json')])
+            self.assertListEqual(kept, paths[1:])
+            self.assertFalse(os.path.exists(paths[0]))
+            self.assertTrue(os.path.exists(paths[1]))
+            self.assertTrue(os.path.exists(paths[2]))
+            self.assertSetEqual(helper._paths, set(paths[1:]))
+
+            self.assertListEqual(helper.cleanup(), [])
+            self.assertFalse(os.path.exists(paths[1]))
+            self.assertFalse(os.path.exists(paths[2]))
+            self.assertSetEqual(helper._paths, set())
+
+    def test_cleanup(self):
+        remove = os.remove
+
+        def failed_remove(path):
+            if os.path.basename(path) == 'locked.txt':
+                raise PermissionError(path)
+            return remove(path)
+
+        for executor in (None, ThreadPoolExecutor(max_workers=4)):
+            with TemporaryDirectory() as tempdir:
+                parent = os.path.join(tempdir, 'parent')
+                child = os.path.join(parent, 'nested', 'child.txt')
+                missing = os.path.join(tempdir, 'missing.txt')
+                locked = os.path.join(tempdir, 'locked.txt')
+                os.makedirs(os.path.dirname(child))
+                write_json(child, {})
+                write_json(locked, {})
+
+                helper = CleanupHelper(executor=executor)
+                for path in (child, parent, missing, locked):
+                    helper.add(path)
+                with patch('os.remove', failed_remove):
+                    self.assertListEqual(helper.cleanup(), [])
+                self.assertFalse(os.path.exists(parent))
+                self.assertTrue(os.path.exists(locked))
+                self.assertSetEqual(helper._paths, {locked})
+
+                # the failed entry should be removed by the next call
+                helper.cleanup()
+                self.assertFalse(os.path.exists(locked))
+                self.assertSetEqual(helper._paths, set())
+
+            if executor is not None:
+                executor.shutdown()
+
+
+class CountingJob(CronJob):
+
+    wakeup_delay = 0.
+
+    def __init__(self, interval):
+        super(CountingJob, self).__init__('counting', interval, None, {})
+        self.runs = 0
+
+    def run_once(self):
+        self.runs += 1
+
+
+class CronJobTestCase(unittest.TestCase):
+
+    def test_wakeup(self):
+        job = CountingJob(interval=3600)
+        with job.run_in_background():
+            time.sleep(0.2)
+            self.assertEqual(job.runs, 1)
+            job.wakeup()
+            time.sleep(0.2)
+            self.assertEqual(job.runs, 2)
+        self.assertTrue(job.stopped)
+
+
+class JsonDictCollectorTestCase(unittest.TestCase):
+
+    def test_collect(self):
+        with TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'result.json')
+            c = JsonDictCollector('result.json', 'result')
+            try:
+                # missing file
+                self.assertIsNone(c.collect(tempdir))
+                self.assertTrue(c.missing)
+
+                # collected, but not committed
+                write_json(path, {'a': 1})
+                self.assertEqual({'a': 1}, c.collect(tempdir))
+                self.assertFalse(c.missing)
+                self.assertEqual({'a': 1}, c.collect(tempdir))
+
+                # committed, thus not collected again unless forced
+                c.commit()
+                self.assertIsNone(c.collect(tempdir))
+                self.assertEqual({'a': 1}, c.collect(tempdir, force=True))
+                c.commit()
+
+                # re-written with identical content
+                write_json(path, {'a': 1})
+                os.utime(path, (1, 1))
+                self.assertIsNone(c.collect(tempdir))
+
+                # changed content
+                write_json(path, {'a': 2, 'b': 'x' * 100000})
+                self.assertEqual({'a': 2, 'b': 'x' * 100000},
+                                 c.collect(tempdir))
+
+                # not a dict
+                write_json(path, [1, 2])
+                with self.assertRaises(ValueError):
+                    _ = c.collect(tempdir)
+            finally:
+                c.close()
+
+    def test_postprocess(self):
+        with TemporaryDirectory() as tempdir:
+            write_json(os.path.join(tempdir, 'webui.json'), {'a': 1})
+            c = JsonDictCollector(
+                'webui.json', 'webui',
+                lambda d: {k.upper(): v for k, v in d.items()}
+            )
+            try:
+                self.assertEqual({'A': 1}, c.collect(tempdir))
+            finally:
+                c.close()
+
+
+class JsonFileWatcherTestCase(unittest.TestCase):
+
+    def test_on_any_event(self):
+        def event(event_type, src_path, **kwargs):
+            return SimpleNamespace(
+                event_type=event_type, src_path=src_path, **kwargs)
+
+        job = PollerJob('poller', StubApi(), {'id': 'exp'},
+                        [('result.json', 'result', None),
+                         ('webui.json', 'webui', None)])
+        watcher = JsonFileWatcher(job)
+        with patch.object(job, 'wakeup') as wakeup:
+            # not the watched files, or not changing the content
+            watcher.on_any_event(event('modified', '/exp/console.log'))
+            watcher.on_any_event(event('opened', '/exp/result.json'))
+            watcher.on_any_event(event('closed_no_write', '/exp/result.json'))
+            watcher.on_any_event(event('deleted', '/exp/result.json'))
+            self.assertEqual(wakeup.call_count, 0)
+
+            watcher.on_any_event(event('modified', '/exp/result.json'))
+            self.assertEqual(wakeup.call_count, 1)
+            # the job should be woken up once, even if both paths match
+            watcher.on_any_event(event('moved', '/exp/webui.json',
+                                       dest_path='/exp/result.json'))
+            self.assertEqual(wakeup.call_count, 2)
+            watcher.on_any_event(event('moved', '/exp/result.json.tmp',
+                                       dest_path='/exp/result.json'))
+            self.assertEqual(wakeup.call_count, 3)
+            for event_type in ('created', 'closed'):
+                watcher.on_any_event(event(event_type, '/exp/webui.json'))
+            self.assertEqual(wakeup.call_count, 5)
+
+
+class PollerJobTestCase(unittest.TestCase):
+
+    SPECS = [('result.json', 'result', None), ('webui.json', 'webui', None)]
+
+    def make_job(self, api, tempdir):
+        doc = {'id': '5c5f0b6b9a1a0c3d2c6a1f00', 'storage_dir': tempdir}
+        return PollerJob('poller', api, doc, self.SPECS, heartbeat_interval=0)
+
+    def test_merged_update(self):
+        with TemporaryDirectory() as tempdir:
+            api = StubApi()
+            job = self.make_job(api, tempdir)
+            try:
+                write_json(os.path.join(tempdir, 'result.json'), {'loss': 1})
+                write_json(os.path.join(tempdir, 'webui.json'), {'a': 'b'})
+                job.run_once()
+                self.assertListEqual(
+                    [{'result': {'loss': 1}, 'webui': {'a': 'b'}}],
+                    api.updates
+                )
+                self.assertEqual({'loss': 1}, job.doc['result'])
+                self.assertEqual(1, api.heartbeats)
+
+                # nothing changed, nothing to store
+                job.run_once()
+                self.assertEqual(1, len(api.updates))
+                self.assertEqual(2, api.heartbeats)
+            finally:
+                job.close()
+
+    def test_rejected_field(self):
+        with TemporaryDirectory() as tempdir:
+            api = StubApi(reject_field='webui')
+            job = self.make_job(api, tempdir)
+            try:
+                write_json(os.path.join(tempdir, 'result.json'), {'loss': 1})
+                write_json(os.path.join(tempdir, 'webui.json'), {'a': 'b'})
+
+                # the merged update fails, but the other field is still
+                # stored, and the heartbeat is still sent
+                with self.assertRaises(RuntimeError):
+                    job.run_once()
+                self.assertListEqual([{'result': {'loss': 1}}], api.updates)
+                self.assertEqual(1, api.heartbeats)
+
+                # the rejected field is sent on its own in later ticks
+                write_json(os.path.join(tempdir, 'result.json'), {'loss': 2})
+                for i in range(4):
+                    with self.assertRaises(RuntimeError):
+                        job.run_once()
+                self.assertListEqual(
+                    [{'result': {'loss': 1}}, {'result': {'loss': 2}}],
+                    api.updates
+                )
+                self.assertEqual(5, api.heartbeats)
+
+                # the field is merged again once it is accepted
+                api.reject_field = None
+                job.run_once()
+                self.assertEqual({'a': 'b'}, api.updates[-1]['webui'])
+            finally:
+                job.close()
+
+
+class ConsoleDuplicatorTestCase(unittest.TestCase):
+
+    def test_on_output(self):
+        with TemporaryDirectory() as tempdir, TemporaryFile() as stdout:
+            log_path = os.path.join(tempdir, 'console.log')
+
+            def read_log():
+                with open(log_path, 'rb') as f:
+                    return f.read()
+
+            def read_stdout():
+                stdout.seek(0)
+                return stdout.read()
+
+            with patch('sys.stdout', stdout), \
+                    ConsoleDuplicator(tempdir, 'console.log',
+                                      read_size=8) as dup:
+                dup.FLUSH_DELAY = 0.1
+
+                # partial lines shorter than the read buffer are not held
+                dup.on_output(b'Load ')
+                self.assertEqual(b'Load ', read_log())
+                self.assertEqual(b'Load ', read_stdout())
+
+                # a full buffer without line break is held for a while
+                dup.on_output(b'xxxxxxxx')
+                self.assertEqual(b'Load ', read_log())
+                dup.on_output(b'yyyyyyyy')
+                time.sleep(0.5)
+                self.assertEqual(b'Load xxxxxxxxyyyyyyyy', read_log())
+
+                # a full buffer with line break is flushed immediately
+                dup.on_output(b'zzzzzzzz')
+                dup.on_output(b'done\nzzz')
+                self.assertEqual(b'Load xxxxxxxxyyyyyyyyzzzzzzzzdone\nzzz',
+                                 read_log())
+
+                # the held output is flushed on exit
+                dup.on_output(b'wwwwwwww')
+
+            expected = b'Load xxxxxxxxyyyyyyyyzzzzzzzzdone\nzzzwwwwwwww'
+            self.assertEqual(expected, read_log())
+            self.assertEqual(expected, read_stdout())
+
+
+class VerifiedMountsTestCase(unittest.TestCase):
+
+    SERVER = 'http://127.0.0.1:8080'
+
+    def test_verified_mounts(self):
+        with TemporaryDirectory() as tempdir:
+            root = os.path.join(tempdir, 'storage')
+            storage_dir = os.path.join(root, 'exp1')
+            os.makedirs(storage_dir)
+            cache_path = os.path.join(tempdir, 'cache/verified_mounts.json')
+            mounts = VerifiedMounts(cache_path, ttl=100)
+
+            # not verified yet, or the cache file is corrupted
+            self.assertFalse(mounts.is_verified(self.SERVER, storage_dir))
+            os.makedirs(os.path.dirname(cache_path))
+            with open(cache_path, 'wb') as f:
+                f.write(b'not json')
+            self.assertFalse(mounts.is_verified(self.SERVER, storage_dir))
+
+            with patch('time.time', return_value=1000.):
+                mounts.set_verified(self.SERVER, storage_dir)
+
+            with patch('time.time', return_value=1099.):
+                # the storage dirs under the same root are verified
+                self.assertTrue(mounts.is_verified(self.SERVER, storage_dir))
+                self.assertTrue(mounts.is_verified(
+                    self.SERVER, os.path.join(root, 'exp2')))
+                self.assertTrue(VerifiedMounts(cache_path, ttl=100).
+                                is_verified(self.SERVER, storage_dir))
+
+                # but not the other dirs sharing the prefix of the root
+                self.assertFalse(mounts.is_verified(
+                    self.SERVER, os.path.join(tempdir, 'storage2/exp1')))
+                self.assertFalse(mounts.is_verified(self.SERVER, root))
+                self.assertFalse(mounts.is_verified(self.SERVER, tempdir))
+
+                # nor the other servers
+                self.assertFalse(mounts.is_verified(
+                    'http://127.0.0.1:8081', storage_dir))
+
+                # nor on the other hosts
+                with patch('socket.gethostname', return_value='other-host'):
+                    self.assertFalse(mounts.is_verified(
+                        self.SERVER, storage_dir))
+
+                # nor if the storage root is on another device
+                stat_result = os.stat(root)
+                with patch('mlstorage_client.mlrun.runner.os.stat',
+                           return_value=os.stat_result(
+                               stat_result[:2] +
+                               (stat_result.st_dev + 1,) +
+                               stat_result[3:]
+                           )):
+                    self.assertFalse(mounts.is_verified(
+                        self.SERVER, storage_dir))
+
+            # the verification expires after the TTL
+            with patch('time.time', return_value=1100.):
+                self.assertFalse(mounts.is_verified(self.SERVER, storage_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+
+from mlstorage_client.api_client_v1 import ApiClientV1
+
+EXPERIMENT_ID = '5c5f0b6b9a1a0c3d2c6a1f00'
+
+
+def mock_response(obj):
+    return Mock(status_code=200, content=json.dumps(obj).encode('utf-8'))
+
+
+def make_doc(**fields):
+    ret = {'id': EXPERIMENT_ID, 'storage_dir': '/mnt/mlstorage/1'}
+    ret.update(fields)
+    return ret
+
+
+class ApiClientV1TestCase(unittest.TestCase):
+
+    def test_retry_statuses(self):
+        with ApiClientV1('http://127.0.0.1:8080') as api:
+            def is_retry(method, endpoint):
+                adapter = api._session.get_adapter(api._v1_prefix + endpoint)
+                return adapter.max_retries.is_retry(method, 503)
+
+            self.assertTrue(is_retry('GET', '/_get/1'))
+            self.assertTrue(is_retry('GET', '/_getfile/1/a.txt'))
+            self.assertTrue(is_retry('POST', '/_query?skip=0&limit=10'))
+            self.assertTrue(is_retry('POST', '/_heartbeat/1'))
+            self.assertTrue(is_retry('POST', '/_update/1'))
+            self.assertTrue(is_retry('POST', '/_set_finished/1'))
+            self.assertFalse(is_retry('POST', '/_create'))
+            self.assertFalse(is_retry('POST', '/_delete/1'))
+
+    def test_skip_identical_updates(self):
+        with ApiClientV1('http://127.0.0.1:8080') as api, \
+                patch.object(api._session, 'request') as request:
+            def update(fields):
+                request.return_value = mock_response(make_doc(**fields))
+                return api.update(EXPERIMENT_ID, fields)
+
+            # the first update is sent
+            self.assertEqual(make_doc(result={'loss': 1}),
+                             update({'result': {'loss': 1}}))
+            self.assertEqual(1, request.call_count)
+            method, uri = request.call_args[0]
+            self.assertEqual('POST', method)
+            self.assertEqual(
+                'http://127.0.0.1:8080/v1/_update/' + EXPERIMENT_ID, uri)
+
+            # an identical update is not sent, but returns the last response
+            self.assertEqual(make_doc(result={'loss': 1}),
+                             update({'result': {'loss': 1}}))
+            self.assertEqual(1, request.call_count)
+
+            # a different update is sent
+            self.assertEqual(make_doc(result={'loss': 2}),
+                             update({'result': {'loss': 2}}))
+            self.assertEqual(2, request.call_count)
+
+            # the remembered update is cleared by `set_finished`
+            request.return_value = mock_response(make_doc(status='COMPLETED'))
+            api.set_finished(EXPERIMENT_ID, 'COMPLETED', {})
+            self.assertEqual(3, request.call_count)
+            update({'result': {'loss': 2}})
+            self.assertEqual(4, request.call_count)
+
+            # and also by `delete`
+            request.return_value = mock_response([EXPERIMENT_ID])
+            api.delete(EXPERIMENT_ID)
+            self.assertEqual(5, request.call_count)
+            update({'result': {'loss': 2}})
+            self.assertEqual(6, request.call_count)
+
+    def test_failed_update_is_not_remembered(self):
+        with ApiClientV1('http://127.0.0.1:8080') as api, \
+                patch.object(api._session, 'request') as request:
+            request.return_value = Mock(status_code=500, text='error')
+            with self.assertRaises(RuntimeError):
+                api.update(EXPERIMENT_ID, {'result': {'loss': 1}})
+            request.return_value = mock_response(make_doc())
+            api.update(EXPERIMENT_ID, {'result': {'loss': 1}})
+            self.assertEqual(2, request.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+import os
+import shutil
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from mlstorage_client.utils import (compute_fs_size, fingerprint_for_files,
+                                    clear_fingerprint_cache, is_script_file,
+                                    collect_relative_files, copy_or_link)
+from mlstorage_client.utils import fileutils
+
+
+class CopyOrLinkTestCase(unittest.TestCase):
+
+    def test_copy(self):
+        with TemporaryDirectory() as tempdir:
+            source = os.path.join(tempdir, 'source.bin')
+            content = os.urandom(3 * 1024 * 1024 + 1)
+            with open(source, 'wb') as f:
+                f.write(content)
+            os.utime(source, (1000000000, 1000000000))
+
+            def check_copy(target, expected=content):
+                copy_or_link(source, target, symlink=False)
+                self.assertFalse(os.path.islink(target))
+                with open(target, 'rb') as f:
+                    self.assertEqual(expected, f.read())
+                self.assertEqual(1000000000, os.stat(target).st_mtime)
+
+            check_copy(os.path.join(tempdir, 'target1.bin'))
+
+            # copy_file_range comes up short, or fails
+            def short_copy(src, dst, count):
+                if os.lseek(src, 0, os.SEEK_CUR) >= 3:
+                    return 0
+                return os.write(dst, os.read(src, 3))
+
+            def failed_copy(src, dst, count):
+                raise OSError('not supported')
+
+            for i, stub in enumerate([short_copy, failed_copy, None]):
+                with patch.object(fileutils, '_copy_file_range', stub):
+                    check_copy(os.path.join(tempdir, 'target{}.bin'.
+                                            format(i + 2)))
+
+            # the target is re-written by the fallback
+            target = os.path.join(tempdir, 'target5.bin')
+            with open(target, 'wb') as f:
+                f.write(b'x' * (4 * 1024 * 1024))
+            with patch.object(fileutils, '_copy_file_range', short_copy):
+                check_copy(target)
+
+            # empty files
+            with open(source, 'wb') as f:
+                f.write(b'')
+            os.utime(source, (1000000000, 1000000000))
+            check_copy(os.path.join(tempdir, 'target6.bin'), b'')
+
+    def test_copy_same_file(self):
+        with TemporaryDirectory() as tempdir:
+            source = os.path.join(tempdir, 'a.txt')
+            link = os.path.join(tempdir, 'link.txt')
+            with open(source, 'wb') as f:
+                f.write(b'hello')
+            os.symlink('a.txt', link)
+
+            for stub in [fileutils._copy_file_range, None]:
+                with patch.object(fileutils, '_copy_file_range', stub):
+                    for target in (source, link):
+                        with self.assertRaises(shutil.SameFileError):
+                            copy_or_link(source, target, symlink=False)
+                    with self.assertRaises(shutil.SameFileError):
+                        copy_or_link(link, source, symlink=False)
+                with open(source, 'rb') as f:
+                    self.assertEqual(b'hello', f.read())
+
+    @unittest.skipUnless(os.path.exists('/proc/self/status'),
+                         'requires procfs')
+    def test_copy_proc_file(self):
+        with TemporaryDirectory() as tempdir:
+            target = os.path.join(tempdir, 'status')
+            copy_or_link('/proc/self/status', target, symlink=False)
+            with open(target, 'rb') as f:
+                self.assertIn(b'Name:', f.read())
+
+
+class CollectRelativeFilesTestCase(unittest.TestCase):
+
+    def test_collect_relative_files(self):
+        with TemporaryDirectory() as tempdir:
+            os.makedirs(os.path.join(tempdir, 'a/b'))
+            with open(os.path.join(tempdir, 'a/b/c.py'), 'wb') as f:
+                f.write(b'')
+
+            cwd = os.getcwd()
+            try:
+                os.chdir(os.path.join(tempdir, 'a'))
+                self.assertListEqual(
+                    ['a/b/c.py', 'a', 'a/b', 'a/b/c.py', ''],
+                    collect_relative_files(
+                        ['b/c.py', '.', './b/../b', '../a/b/c.py',
+                         'b/d.py', '..', '../..', '/'],
+                        '..'
+                    )
+                )
+            finally:
+                os.chdir(cwd)
+
+
+class IsScriptFileTestCase(unittest.TestCase):
+
+    def test_is_script_file(self):
+        with TemporaryDirectory() as tempdir:
+            for name in ['a.py', 'b.SH', 'c.txt', 'd.r', 'e.pyc']:
+                with open(os.path.join(tempdir, name), 'wb') as f:
+                    f.write(b'')
+            os.makedirs(os.path.join(tempdir, 'f.py'))
+
+            self.assertTrue(is_script_file('a.py', tempdir))
+            self.assertTrue(is_script_file('b.SH', tempdir))
+            self.assertTrue(is_script_file('d.r', tempdir))
+            self.assertFalse(is_script_file('c.txt', tempdir))
+            self.assertFalse(is_script_file('e.pyc', tempdir))
+            self.assertFalse(is_script_file('f.py', tempdir))
+            self.assertFalse(is_script_file('g.py', tempdir))
+
+
+class FingerprintForFilesTestCase(unittest.TestCase):
+
+    def test_fingerprint_for_files(self):
+        with TemporaryDirectory() as tempdir:
+            def write_file(name, content):
+                with open(os.path.join(tempdir, name), 'wb') as f:
+                    f.write(content)
+
+            write_file('a.py', b'print("hello")')
+            write_file('b.py', b'')
+            write_file('c.py', b'x' * 100000)
+
+            self.assertIsNone(fingerprint_for_files([], tempdir))
+            fp = fingerprint_for_files(['a.py', 'b.py', 'c.py'], tempdir)
+            self.assertIsInstance(fp, str)
+            self.assertEqual(
+                fp, fingerprint_for_files(['c.py', 'b.py', 'a.py'], tempdir))
+            self.assertEqual(
+                fp, fingerprint_for_files(['a.py', 'b.py', 'c.py'], tempdir,
+                                          buffer_size=7))
+            self.assertEqual(
+                fp, fingerprint_for_files(['a.py', 'b.py', 'c.py'], tempdir,
+                                          max_workers=1))
+
+            # the buffered reader, used before Python 3.11
+            with patch.object(fileutils, '_file_digest', None):
+                for max_workers in (1, 8):
+                    clear_fingerprint_cache()
+                    self.assertEqual(
+                        fp,
+                        fingerprint_for_files(
+                            ['a.py', 'b.py', 'c.py'], tempdir,
+                            buffer_size=7, max_workers=max_workers)
+                    )
+
+            self.assertNotEqual(
+                fp, fingerprint_for_files(['a.py', 'c.py'], tempdir))
+
+            # the fingerprint does not depend on the previous calls for the
+            # same files via another root path
+            cwd = os.getcwd()
+            try:
+                os.chdir(tempdir)
+                clear_fingerprint_cache()
+                rel_fp = fingerprint_for_files(['a.py', 'b.py', 'c.py'], '.')
+                self.assertNotEqual(fp, rel_fp)
+                self.assertEqual(
+                    fp,
+                    fingerprint_for_files(['a.py', 'b.py', 'c.py'], tempdir)
+                )
+                clear_fingerprint_cache()
+                self.assertEqual(
+                    rel_fp,
+                    fingerprint_for_files(['a.py', 'b.py', 'c.py'], '.')
+                )
+            finally:
+                os.chdir(cwd)
+
+            # change the content of a file (the cache is cleared, since the
+            # mtime may not change within the timestamp granularity)
+            write_file('c.py', b'x' * 99999 + b'y')
+            clear_fingerprint_cache()
+            self.assertNotEqual(
+                fp, fingerprint_for_files(['a.py', 'b.py', 'c.py'], tempdir))
+
+
+class ComputeFsSizeTestCase(unittest.TestCase):
+
+    def test_compute_fs_size(self):
+        with TemporaryDirectory() as tempdir:
+            os.makedirs(os.path.join(tempdir, 'a/b/c'))
+            os.makedirs(os.path.join(tempdir, 'd'))
+            for i, name in enumerate(['1.txt', 'a/2.txt', 'a/b/c/3.txt',
+                                      'd/4.txt']):
+                with open(os.path.join(tempdir, name), 'wb') as f:
+                    f.write(b'x' * (i * 1000 + 1))
+            os.symlink(os.path.join(tempdir, 'a'),
+                       os.path.join(tempdir, 'd/link'))
+
+            # check the size of a single file
+            self.assertEqual(
+                1001, compute_fs_size(os.path.join(tempdir, 'a/2.txt')))
+
+            # check the size of a directory, with and without an executor
+            size = compute_fs_size(tempdir)
+            self.assertGreater(size, 1 + 1001 + 2001 + 3001)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                self.assertEqual(
+                    size, compute_fs_size(tempdir, executor=executor))
+
+
+if __name__ == '__main__':
+    unittest.main()
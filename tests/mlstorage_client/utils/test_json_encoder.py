@@ -0,0 +1,104 @@
+import json
+import unittest
+from datetime import datetime
+
+import orjson
+from bson import ObjectId
+from pytz import UTC
+
+from mlstorage_client.utils import JsonEncoder
+
+
+class MyDateTime(datetime):
+    pass
+
+
+class JsonEncoderTestCase(unittest.TestCase):
+
+    def test_encode(self):
+        oid = ObjectId('5c5f0b6b9a1a0c3d2c6a1f00')
+        obj = {
+            'datetime': datetime(2019, 1, 1, 12, 30),
+            'my_datetime': MyDateTime(2019, 1, 2),
+            'object_id': oid,
+            'bytes': b'hello',
+            'bad_bytes': b'\xff',
+        }
+        self.assertDictEqual(
+            {'datetime': '2019-01-01T12:30:00',
+             'my_datetime': '2019-01-02T00:00:00',
+             'object_id': str(oid),
+             'bytes': 'hello',
+             'bad_bytes': repr(b'\xff')},
+            json.loads(JsonEncoder().encode(obj))
+        )
+        self.assertListEqual(
+            [1546345800.0],
+            json.loads(JsonEncoder(use_timestamp=True).encode(
+                [datetime(2019, 1, 1, 12, 30)]))
+        )
+        with self.assertRaises(TypeError):
+            _ = JsonEncoder().encode([object()])
+
+    def test_dumps(self):
+        oid = ObjectId('5c5f0b6b9a1a0c3d2c6a1f00')
+        obj = {
+            'datetime': datetime(2019, 1, 1, 12, 30, 0, 123),
+            'utc_datetime': datetime(2019, 1, 1, 12, 30, tzinfo=UTC),
+            'my_datetime': MyDateTime(2019, 1, 2),
+            'object_id': oid,
+            'bytes': b'hello',
+            'bad_bytes': b'\xff',
+            'nested': {1: [oid, (1.5, None, True)]},
+        }
+        expected = {
+            'datetime': '2019-01-01T12:30:00.000123',
+            'utc_datetime': '2019-01-01T12:30:00+00:00',
+            'my_datetime': '2019-01-02T00:00:00',
+            'object_id': str(oid),
+            'bytes': 'hello',
+            'bad_bytes': repr(b'\xff'),
+            'nested': {'1': [str(oid), [1.5, None, True]]},
+        }
+        self.assertDictEqual(expected, json.loads(JsonEncoder().dumps(obj)))
+        self.assertEqual(
+            b'{"a":1,"b":2}',
+            JsonEncoder().dumps({'b': 2, 'a': 1}, option=orjson.OPT_SORT_KEYS)
+        )
+        self.assertListEqual(
+            [1546345800.0],
+            json.loads(JsonEncoder(use_timestamp=True).dumps(
+                [datetime(2019, 1, 1, 12, 30)]))
+        )
+        with self.assertRaises(TypeError):
+            _ = JsonEncoder().dumps([object()])
+
+    def test_object_handlers(self):
+        class Point(object):
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+        class MyEncoder(JsonEncoder):
+            def _point_handler(self, o):
+                if isinstance(o, Point):
+                    return [o.x, o.y]
+                return self.UNHANDLED
+
+            def _legacy_handler(self, o):
+                if isinstance(o, complex):
+                    yield [o.real, o.imag]
+
+            OBJECT_HANDLERS = [_point_handler, _legacy_handler]
+
+        self.assertListEqual(
+            [[1, 2], [3., 4.], 'hello', None],
+            json.loads(MyEncoder().encode(
+                [Point(1, 2), 3 + 4j, b'hello', None]))
+        )
+        with self.assertRaises(TypeError):
+            _ = MyEncoder().encode([object()])
+
+
+if __name__ == '__main__':
+    unittest.main()
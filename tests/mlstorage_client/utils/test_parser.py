@@ -1,7 +1,9 @@
 import json
 import unittest
+from unittest.mock import patch
 
 from mlstorage_client.utils import Tokens, parse_config, parse_tags
+from mlstorage_client.utils import parser
 
 
 class TokensTestCase(unittest.TestCase):
@@ -76,5 +78,50 @@ class ParseTagsTestCaes(unittest.TestCase):
         )
 
 
+class ScannerTestCase(unittest.TestCase):
+
+    def test_same_as_pyparsing(self):
+        def parse(f, text, use_pyparsing):
+            with patch.object(parser, '_USE_PYPARSING', use_pyparsing):
+                try:
+                    return f(text)
+                except ValueError:
+                    return ValueError
+
+        def g(text):
+            for f in (parse_config, parse_tags):
+                expected = parse(f, text, True)
+                actual = parse(f, text, False)
+                self.assertEqual(expected, actual, msg=repr(text))
+                if isinstance(expected, dict):
+                    self.assertEqual(
+                        [type(v) for v in expected.values()],
+                        [type(v) for v in actual.values()],
+                        msg=repr(text)
+                    )
+
+        for text in [
+                '', '  ', 'a', 'a=', 'a= ', 'a=,', 'a=1,', ',a=1', 'a=1,,b=2',
+                '1a=1', 'a-b=1', 'a b=1', 'a=1,b', ' a = -1 , b = +2 ',
+                'a=1.,b=.5,c=1e3,d=1.5E-3,e=1e,f=1.5e+,g=+-1', 'a=007',
+                'a=on,b=off,c=yes,d=no,e=True,f=False,g=only,h=onx',
+                'a=1 2,b=true false,c=1\t', 'a=\t1\t,b=\ttrue\n',
+                'a="x",b=" y ",c=""', 'a="x" y', 'a="x"y,b=1', 'a="x',
+                'a="x\\"y\\\\z\\t\\n\\q"', 'a="x\ny"', 'a=x"y"z',
+                'a=[1]', 'a=1]', 'a={}', 'a=x[', 'a=\x0c1',
+                'a, b ,c d', 'a,', 'a,,b', ',', '"a" b', '"a"b,c', '"a,b",c',
+                '"', '"a', '[a]', 'a[', 'a,"",b', 'a\tb,c',
+        ]:
+            g(text)
+
+    def test_syntax_error(self):
+        for text in ['a', 'a=1,', 'a="x" y', 'a=[1]', '1a=1']:
+            with self.assertRaises(ValueError):
+                _ = parse_config(text)
+        for text in ['"a" b', '[a]', 'a[']:
+            with self.assertRaises(ValueError):
+                _ = parse_tags(text)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,51 @@
+import os
+import stat
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from mlstorage_client.utils import run_tensorboard
+from mlstorage_client.utils.run_tensorboard import _local_ip
+
+# a fake TensorBoard, which reports the url line in two separated writes,
+# after a long output which exceeds the url search window
+_FAKE_TENSORBOARD = '''#!{executable}
+import sys, time
+sys.stdout.write('x' * 10000 + '\\nTensorBoard 1.')
+sys.stdout.flush()
+time.sleep(0.3)
+sys.stdout.write('13 at http://{host}:6006 (Press CTRL+C to quit)\\n')
+sys.stdout.flush()
+time.sleep(30)
+'''
+
+
+class RunTensorBoardTestCase(unittest.TestCase):
+
+    def _fake_tensorboard(self, tempdir, host):
+        path = os.path.join(tempdir, 'tensorboard')
+        with open(path, 'w') as f:
+            f.write(_FAKE_TENSORBOARD.format(
+                executable=sys.executable, host=host))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+        return patch.dict(os.environ, {
+            'PATH': tempdir + os.pathsep + os.environ.get('PATH', '')})
+
+    @unittest.skipIf(sys.platform == 'win32', 'requires executable scripts')
+    def test_url_in_pieces(self):
+        with TemporaryDirectory() as tempdir:
+            log_file = os.path.join(tempdir, 'tensorboard.log')
+            with self._fake_tensorboard(tempdir, 'myhost'), \
+                    run_tensorboard(tempdir, log_file=log_file) as uri:
+                self.assertEqual(uri, 'http://myhost:6006')
+            with open(log_file, 'rb') as f:
+                self.assertIn(b'TensorBoard 1.13 at http://myhost:6006',
+                              f.read())
+
+    @unittest.skipIf(sys.platform == 'win32', 'requires executable scripts')
+    def test_any_host(self):
+        with TemporaryDirectory() as tempdir:
+            with self._fake_tensorboard(tempdir, '0.0.0.0'), \
+                    run_tensorboard(tempdir) as uri:
+                self.assertEqual(uri, 'http://{}:6006'.format(_local_ip()))